@@ -1,14 +1,45 @@
 from fastapi import APIRouter, HTTPException
 from schemas.emotion import EmotionAnalyzeRequest, EmotionAnalyzeResponse
-from services.llm_service import analyze_emotions
+from services.llm_service import emotion_scheduler, model_status
+from services.inference_scheduler import SchedulerOverloaded
+from services.emotion_cache import emotion_cache
 
 router = APIRouter(prefix="/emotion", tags=["emotion"])
 
 
 @router.post("/analyze", response_model=EmotionAnalyzeResponse)
-def analyze_emotion(data: EmotionAnalyzeRequest):
+async def analyze_emotion(data: EmotionAnalyzeRequest):
     if not data.text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
 
-    emotions = analyze_emotions(data.text)
+    # Repeated texts are answered from memory; the rest is batched with
+    # concurrent requests (cache lookups in bulk, then one forward pass)
+    emotions = emotion_cache.get(data.text)
+    if emotions is None:
+        if model_status()["state"] == "loading":
+            raise HTTPException(
+                status_code=503,
+                detail="Emotion model is loading, please retry shortly",
+                headers={"Retry-After": "5"}
+            )
+        try:
+            emotions = await emotion_scheduler.submit(data.text)
+        except SchedulerOverloaded as e:
+            raise HTTPException(
+                status_code=429,
+                detail="Emotion analysis is busy, please retry later",
+                headers={"Retry-After": str(e.retry_after)}
+            )
     return {"emotions": emotions}
+
+
+@router.get("/cache/stats")
+def emotion_cache_stats():
+    """Hit/miss counters of the emotion result cache since startup (this worker)"""
+    return emotion_cache.stats()
+
+
+@router.get("/scheduler/stats")
+def emotion_scheduler_stats():
+    """Inference queue depth, batching and rejection counters since startup (this worker)"""
+    return emotion_scheduler.stats()
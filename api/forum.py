@@ -1,51 +1,128 @@
 # api/forum.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import Response as HttpResponse
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from models.user import User
 from models.forum import Post, Response
-from core.database import get_db
-from repo import forum_repo
+from models.user import User
+from core.database import get_db, SessionLocal
+from core.broker import broker, HEARTBEAT_SECONDS
+from core.pagination import decode_cursor, decode_rank_cursor, encode_cursor
+from repo import forum_repo, search_repo, user_repo
+from services import author_service, forum_tasks
+from services.forum_import import ForumImporter, DEFAULT_BATCH_SIZE
 from schemas.forum import (
     ForumCreate, ForumResponse,
-    PostCreate, PostUpdate, PostResponse,
-    ResponseCreate, ResponseUpdate, ResponseResponse,
-    ReportContent
+    PostCreate, PostUpdate, PostResponse, PostPaginatedResponse,
+    ResponseCreate, ResponseUpdate, ResponseResponse, ResponsePaginatedResponse,
+    LikedIdsResponse, ForumSearchPaginatedResponse, ThreadResponse,
+    ReportContent, ModerationQueueResponse, ModerationAction, ModerationResult,
+    ImportResult
 )
 
 
 router = APIRouter(prefix="/forums", tags=["forums"])
 
 
+def _parse_cursor(cursor: Optional[str], decode=decode_cursor):
+    """Decode a pagination cursor, rejecting malformed ones with a 400"""
+    try:
+        return decode(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _require_user(db: Session, user_id: int) -> None:
+    """404 for an unknown user_id, before it reaches a foreign key"""
+    if not user_repo.user_exists(db, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+
+
 # =====================================================
 # FORUMS
 # =====================================================
 
 
+def _etag(*parts) -> str:
+    """Weak ETag derived from a content version and the request parameters"""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _is_fresh(request: Request, etag: str) -> bool:
+    """True when the client's If-None-Match already names this ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+
+def _not_modified(etag: str) -> HttpResponse:
+    return HttpResponse(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def _set_etag(response: HttpResponse, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def _forum_to_dict(forum, moderator_count: int, post_count: int) -> dict:
+    """Build a ForumResponse payload from a forum directory row"""
+    return {
+        "id": forum.id,
+        "name": forum.name,
+        "description": forum.description,
+        "thematic": forum.thematic,
+        "created_at": forum.created_at,
+        "is_active": forum.is_active,
+        "moderator_count": moderator_count,
+        "post_count": post_count
+    }
+
+
 @router.get("/", response_model=List[ForumResponse])
-def get_all_forums(db: Session = Depends(get_db)):
+def get_all_forums(request: Request, response: HttpResponse, db: Session = Depends(get_db)):
     """
     Get all forums with their metadata.
-    Returns list of forums with post count and moderator count.
+    Returns list of forums with post count and moderator count,
+    fetched in a single query regardless of the number of forums.
+    Answers 304 when If-None-Match matches the current ETag.
     """
-    forums = forum_repo.get_all_forums(db)
-    
-    result = []
-    for forum in forums:
-        result.append({
-            "id": forum.id,
-            "name": forum.name,
-            "description": forum.description,
-            "thematic": forum.thematic,
-            "created_at": forum.created_at,
-            "is_active": forum.is_active,
-            "moderator_count": forum_repo.get_moderator_count(db, forum.id),
-            "post_count": forum_repo.get_post_count_for_forum(db, forum.id)
-        })
-    
-    return result
+    etag = _etag("directory", *forum_repo.get_directory_version(db))
+    if _is_fresh(request, etag):
+        return _not_modified(etag)
+    _set_etag(response, etag)
+
+    rows = forum_repo.get_forum_directory(db)
+    return [_forum_to_dict(*row) for row in rows]
+
+
+@router.get("/search", response_model=ForumSearchPaginatedResponse)
+def search_forums(
+    q: str = Query(..., min_length=1, max_length=200),
+    forum_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search across posts and responses, best match first.
+    Optionally restricted to one forum; pass next_cursor as ?cursor= for more results.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+
+    results, next_cursor = search_repo.search_forum(
+        db, q, forum_id, _parse_cursor(cursor, decode_rank_cursor), limit
+    )
+    return {"results": results, "next_cursor": next_cursor}
 
 
 @router.get("/{forum_id}", response_model=ForumResponse)
@@ -53,20 +130,11 @@ def get_forum_by_id(forum_id: int, db: Session = Depends(get_db)):
     """
     Get a single forum by ID with metadata.
     """
-    forum = forum_repo.get_forum_by_id(db, forum_id)
-    if not forum:
+    row = forum_repo.get_forum_directory_entry(db, forum_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Forum not found")
     
-    return {
-        "id": forum.id,
-        "name": forum.name,
-        "description": forum.description,
-        "thematic": forum.thematic,
-        "created_at": forum.created_at,
-        "is_active": forum.is_active,
-        "moderator_count": forum_repo.get_moderator_count(db, forum.id),
-        "post_count": forum_repo.get_post_count_for_forum(db, forum.id)
-    }
+    return _forum_to_dict(*row)
 
 
 # =====================================================
@@ -74,12 +142,33 @@ def get_forum_by_id(forum_id: int, db: Session = Depends(get_db)):
 # =====================================================
 
 
+def _post_to_dict(post, author, like_count: int, response_count: int, viewer_id: Optional[int] = None) -> dict:
+    """Build a PostResponse payload from a post feed row, as seen by viewer_id (if known)"""
+    return {
+        "id": post.id,
+        "forum_id": post.forum_id,
+        "author_id": author_service.display_author_id(post.author_id, post.is_anonymous, viewer_id),
+        "author_name": author_service.display_name(author_service.author_name(author), post.is_anonymous),
+        "title": post.title,
+        "content": post.content,
+        "is_anonymous": post.is_anonymous,
+        "created_at": post.created_at,
+        "updated_at": post.updated_at,
+        "like_count": like_count,
+        "response_count": response_count
+    }
+
+
 @router.post("/posts", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
 def create_post(data: PostCreate, db: Session = Depends(get_db)):
     """
     Create a post.
     user_id is provided in the request body (NO auth dependency).
     """
+    if not forum_repo.get_forum_by_id(db, data.forum_id):
+        raise HTTPException(status_code=404, detail="Forum not found")
+    _require_user(db, data.user_id)
+
     post = forum_repo.create_post(
         db=db,
         forum_id=data.forum_id,
@@ -89,71 +178,110 @@ def create_post(data: PostCreate, db: Session = Depends(get_db)):
         is_anonymous=data.is_anonymous
     )
 
-    # Get author information
-    author = db.query(User).filter(User.id == post.author_id).first()
-    
-    # Extract author name (email prefix if no full name)
-    author_name = "Unknown User"
-    if author:
-        if hasattr(author, 'full_name') and author.full_name:
-            author_name = author.full_name
-        elif hasattr(author, 'first_name') and author.first_name:
-            last_name = getattr(author, 'last_name', '')
-            author_name = f"{author.first_name} {last_name}".strip()
-        elif author.email:
-            author_name = author.email.split('@')[0]
+    return _post_to_dict(*forum_repo.get_post_feed_entry(db, post.id), viewer_id=data.user_id)
 
-    return {
-        "id": post.id,
-        "forum_id": post.forum_id,
-        "author_id": post.author_id,
-        "author_name": author_name,
-        "title": post.title,
-        "content": post.content,
-        "is_anonymous": post.is_anonymous,
-        "created_at": post.created_at,
-        "updated_at": post.updated_at,
-        "like_count": 0,
-        "response_count": 0
-    }
 
+@router.get("/{forum_id}/posts", response_model=PostPaginatedResponse)
+def get_posts_for_forum(
+    forum_id: int,
+    request: Request,
+    response: HttpResponse,
+    sort: str = Query("new", pattern="^(new|hot)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of posts for a specific forum with author information.
+    sort=new (default) is newest first; sort=hot ranks by likes and responses
+    with time decay, using the precomputed hot_score (its ETag also expires
+    with each re-decay interval).
+    Pass the returned next_cursor as ?cursor= (with the same sort) to fetch the following page.
+    Answers 304 when If-None-Match matches the current ETag.
+    """
+    version = forum_repo.get_forum_version(db, forum_id)
+    if version is not None:
+        # Hot scores are re-decayed periodically without bumping the version
+        epoch = forum_tasks.decay_epoch() if sort == "hot" else None
+        etag = _etag("feed", forum_id, version, sort, epoch, cursor, limit)
+        if _is_fresh(request, etag):
+            return _not_modified(etag)
+        _set_etag(response, etag)
+
+    if sort == "hot":
+        rows, next_cursor = forum_repo.get_hot_post_feed(
+            db, forum_id, _parse_cursor(cursor, decode_rank_cursor), limit
+        )
+    else:
+        rows, next_cursor = forum_repo.get_post_feed(db, forum_id, _parse_cursor(cursor), limit)
+    return {"posts": [_post_to_dict(*row) for row in rows], "next_cursor": next_cursor}
+
+
+async def _sse_events(forum_id: int):
+    """
+    Encode broker events of a forum as Server-Sent Events, with heartbeats while
+    idle. Subscribes on first iteration, so a client gone before then leaves nothing behind.
+    """
+    reported_drops = 0
+    subscription = None
+    try:
+        subscription = broker.subscribe(forum_id)
+        yield "retry: 3000\n\n"
+        while True:
+            event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            if subscription.dropped > reported_drops:
+                # The subscriber fell behind and lost events: ask it to refetch
+                reported_drops = subscription.dropped
+                yield f"event: resync\ndata: {json.dumps({'forum_id': subscription.forum_id})}\n\n"
+            if event is None:
+                yield ": heartbeat\n\n"
+                continue
+            payload = {key: value for key, value in event.items() if key != "key"}
+            yield f"event: {event['type']}\ndata: {json.dumps(payload)}\n\n"
+    finally:
+        if subscription is not None:
+            broker.unsubscribe(subscription)
+
+
+@router.get("/{forum_id}/live")
+async def live_forum_events(forum_id: int):
+    """
+    Server-Sent Events stream of a forum: post_created, response_created,
+    post_like and response_like events carrying ids and fresh counts.
+    Like events are coalesced per item when a client reads slowly; a resync
+    event tells the client to refetch after events were dropped.
+    """
+    db = SessionLocal()
+    try:
+        forum = await run_in_threadpool(forum_repo.get_forum_by_id, db, forum_id)
+    finally:
+        await run_in_threadpool(db.close)
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
 
-@router.get("/{forum_id}/posts", response_model=List[PostResponse])
-def get_posts_for_forum(forum_id: int, db: Session = Depends(get_db)):
-    """Get all posts for a specific forum with author information"""
-    posts = forum_repo.get_posts_by_forum(db, forum_id)
-
-    result = []
-    for post in posts:
-        # Get author information
-        author = db.query(User).filter(User.id == post.author_id).first()
-        
-        # Extract author name (email prefix if no full name)
-        author_name = "Unknown User"
-        if author:
-            if hasattr(author, 'full_name') and author.full_name:
-                author_name = author.full_name
-            elif hasattr(author, 'first_name') and author.first_name:
-                last_name = getattr(author, 'last_name', '')
-                author_name = f"{author.first_name} {last_name}".strip()
-            elif author.email:
-                author_name = author.email.split('@')[0]
-        
-        result.append({
-            "id": post.id,
-            "forum_id": post.forum_id,
-            "author_id": post.author_id,
-            "author_name": author_name,
-            "title": post.title,
-            "content": post.content,
-            "is_anonymous": post.is_anonymous,
-            "created_at": post.created_at,
-            "updated_at": post.updated_at,
-            "like_count": forum_repo.get_post_like_count(db, post.id),
-            "response_count": forum_repo.get_response_count_for_post(db, post.id)
-        })
-
-    return result
+    return StreamingResponse(
+        _sse_events(forum_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/users/{user_id}/posts", response_model=PostPaginatedResponse)
+def get_posts_for_user(
+    user_id: int,
+    viewer_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of posts written by a user, newest first.
+    Anonymous posts are only listed when the user views their own posts (viewer_id = user_id).
+    Pass the returned next_cursor as ?cursor= to fetch the following page.
+    """
+    own = viewer_id == user_id
+    rows, next_cursor = forum_repo.get_user_post_feed(db, user_id, _parse_cursor(cursor), limit, include_anonymous=own)
+    return {"posts": [_post_to_dict(*row, viewer_id=viewer_id) for row in rows], "next_cursor": next_cursor}
 
 
 @router.put("/posts/{post_id}", response_model=PostResponse)
@@ -171,40 +299,14 @@ def update_post(
     if post.author_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    updated_post = forum_repo.update_post(
+    forum_repo.update_post(
         db,
         post_id,
         data.title,
         data.content
     )
 
-    # Get author information
-    author = db.query(User).filter(User.id == updated_post.author_id).first()
-    
-    # Extract author name
-    author_name = "Unknown User"
-    if author:
-        if hasattr(author, 'full_name') and author.full_name:
-            author_name = author.full_name
-        elif hasattr(author, 'first_name') and author.first_name:
-            last_name = getattr(author, 'last_name', '')
-            author_name = f"{author.first_name} {last_name}".strip()
-        elif author.email:
-            author_name = author.email.split('@')[0]
-
-    return {
-        "id": updated_post.id,
-        "forum_id": updated_post.forum_id,
-        "author_id": updated_post.author_id,
-        "author_name": author_name,
-        "title": updated_post.title,
-        "content": updated_post.content,
-        "is_anonymous": updated_post.is_anonymous,
-        "created_at": updated_post.created_at,
-        "updated_at": updated_post.updated_at,
-        "like_count": forum_repo.get_post_like_count(db, post_id),
-        "response_count": forum_repo.get_response_count_for_post(db, post_id)
-    }
+    return _post_to_dict(*forum_repo.get_post_feed_entry(db, post_id), viewer_id=user_id)
 
 
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -231,27 +333,57 @@ def toggle_post_like(post_id: int, user_id: int, db: Session = Depends(get_db)):
     post = forum_repo.get_post_by_id(db, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
+    _require_user(db, user_id)
     
-    liked = forum_repo.toggle_post_like(db, post_id, user_id)
-    new_count = forum_repo.get_post_like_count(db, post_id)
+    forum_id = post.forum_id
+    toggled = forum_repo.toggle_post_like(db, post_id, user_id)
+    if toggled is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    liked, new_count = toggled
     
     return {
         "liked": liked,
         "like_count": new_count,
         "post_id": post_id,
-        "forum_id": post.forum_id,
+        "forum_id": forum_id,
         "message": "Post liked" if liked else "Post unliked"
     }
 
 
+@router.get("/posts/liked", response_model=LikedIdsResponse)
+def get_liked_posts(
+    user_id: int,
+    ids: List[int] = Query(..., max_length=200),
+    db: Session = Depends(get_db)
+):
+    """Return which of the given post ids (?ids=1&ids=2...) the user has liked"""
+    return {"user_id": user_id, "liked_ids": forum_repo.get_liked_post_ids(db, user_id, ids)}
+
+
 # =====================================================
 # RESPONSES
 # =====================================================
 
 
+def _response_to_dict(response, author_name: str, viewer_id: Optional[int] = None) -> dict:
+    """Build a ResponseResponse payload for a response and its author's display name, as seen by viewer_id (if known)"""
+    return {
+        "id": response.id,
+        "post_id": response.post_id,
+        "author_id": author_service.display_author_id(response.author_id, response.is_anonymous, viewer_id),
+        "author_name": author_service.display_name(author_name, response.is_anonymous),
+        "content": response.content,
+        "is_anonymous": response.is_anonymous,
+        "created_at": response.created_at,
+        "updated_at": response.updated_at,
+        "like_count": response.like_count
+    }
+
+
 @router.post("/responses", response_model=ResponseResponse, status_code=status.HTTP_201_CREATED)
 def create_response(data: ResponseCreate, db: Session = Depends(get_db)):
     """Create a response/comment on a post"""
+    _require_user(db, data.user_id)
     response = forum_repo.create_response(
         db=db,
         post_id=data.post_id,
@@ -259,62 +391,116 @@ def create_response(data: ResponseCreate, db: Session = Depends(get_db)):
         content=data.content,
         is_anonymous=data.is_anonymous
     )
+    if not response:
+        raise HTTPException(status_code=404, detail="Post not found")
 
-    # Get author information
-    author = db.query(User).filter(User.id == response.author_id).first()
-    
-    # Extract author name
-    author_name = "Unknown User"
-    if author:
-        if hasattr(author, 'full_name') and author.full_name:
-            author_name = author.full_name
-        elif hasattr(author, 'first_name') and author.first_name:
-            last_name = getattr(author, 'last_name', '')
-            author_name = f"{author.first_name} {last_name}".strip()
-        elif author.email:
-            author_name = author.email.split('@')[0]
+    author_names = author_service.resolve_author_names(db, [response.author_id])
+    return _response_to_dict(response, author_names[response.author_id], viewer_id=data.user_id)
 
+
+@router.get("/posts/{post_id}/responses", response_model=ResponsePaginatedResponse)
+def get_responses(
+    post_id: int,
+    request: Request,
+    response: HttpResponse,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of responses for a specific post, oldest first.
+    Pass the returned next_cursor as ?cursor= to fetch the following page.
+    Answers 304 when If-None-Match matches the current ETag.
+    """
+    version = forum_repo.get_post_forum_version(db, post_id)
+    if version is not None:
+        etag = _etag("responses", post_id, version, cursor, limit)
+        if _is_fresh(request, etag):
+            return _not_modified(etag)
+        _set_etag(response, etag)
+
+    responses, next_cursor = forum_repo.get_responses_by_post(db, post_id, _parse_cursor(cursor), limit)
+
+    author_names = author_service.resolve_author_names(db, (r.author_id for r in responses))
     return {
-        "id": response.id,
-        "post_id": response.post_id,
-        "author_id": response.author_id,
-        "author_name": author_name,
-        "content": response.content,
-        "is_anonymous": response.is_anonymous,
-        "created_at": response.created_at,
-        "updated_at": response.updated_at,
-        "like_count": 0
+        "responses": [_response_to_dict(r, author_names[r.author_id]) for r in responses],
+        "next_cursor": next_cursor
     }
 
 
-@router.get("/posts/{post_id}/responses", response_model=List[ResponseResponse])
-def get_responses(post_id: int, db: Session = Depends(get_db)):
-    """Get all responses for a specific post"""
-    responses = forum_repo.get_responses_by_post(db, post_id)
-
-    result = []
-    for r in responses:
-        # Get author information
-        author = db.query(User).filter(User.id == r.author_id).first()
-        
-        # Extract author name
-        author_name = "User"
-        if author and author.email:
-            author_name = author.email.split('@')[0]
-        
-        result.append({
-            "id": r.id,
-            "post_id": r.post_id,
-            "author_id": r.author_id,
-            "author_name": author_name,
-            "content": r.content,
-            "is_anonymous": r.is_anonymous,
-            "created_at": r.created_at,
-            "updated_at": r.updated_at,
-            "like_count": forum_repo.get_response_like_count(db, r.id)
-        })
-
-    return result
+def _stream_thread(post_json: str, post_id: int, after, limit: int, page_size: int = 200):
+    """
+    Encode a ThreadResponse incrementally: responses are read in keyset pages and
+    each page is emitted as one chunk, so memory does not grow with thread length.
+    The read transaction ends before each chunk is sent: an open SQLite read
+    cursor would lock writers out for as long as the download takes.
+    Uses its own session because the generator outlives the request handler.
+    """
+    db = SessionLocal()
+    try:
+        yield '{"post":' + post_json + ',"responses":['
+        emitted = 0
+        next_cursor = None
+        position = after
+        while True:
+            # One row past the limit tells whether there is a next page
+            requested = min(page_size, limit + 1 - emitted)
+            rows = forum_repo.get_thread_responses_page(db, post_id, position, requested)
+            chunk = []
+            for response, author in rows:
+                if emitted == limit:
+                    next_cursor = encode_cursor(*position)
+                    break
+                payload = _response_to_dict(response, author_service.author_name(author))
+                chunk.append(("," if emitted else "") + ResponseResponse(**payload).model_dump_json())
+                emitted += 1
+                position = (response.created_at, response.id)
+            db.rollback()  # Read-only: releases the SHARED lock before sending
+            if chunk:
+                yield "".join(chunk)
+            if next_cursor is not None or len(rows) < requested:
+                break
+        yield '],"next_cursor":' + json.dumps(next_cursor) + '}'
+    finally:
+        db.close()
+
+
+@router.get(
+    "/posts/{post_id}/thread",
+    response_model=None,
+    responses={200: {"model": ThreadResponse}}
+)
+def get_thread(
+    post_id: int,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a post with its author and counts plus a page of its responses, oldest first.
+    Costs two queries plus one per 200 responses, and the body is streamed.
+    Pass next_cursor as ?cursor= to continue with the following responses.
+    Answers 304 when If-None-Match matches the current ETag.
+    """
+    version = forum_repo.get_post_forum_version(db, post_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    etag = _etag("thread", post_id, version, cursor, limit)
+    if _is_fresh(request, etag):
+        return _not_modified(etag)
+
+    row = forum_repo.get_post_feed_entry(db, post_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    post_json = PostResponse(**_post_to_dict(*row)).model_dump_json()
+    return StreamingResponse(
+        _stream_thread(post_json, post_id, _parse_cursor(cursor), limit),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
 
 
 @router.put("/responses/{response_id}", response_model=ResponseResponse)
@@ -334,31 +520,8 @@ def update_response(
 
     updated = forum_repo.update_response(db, response_id, data.content)
 
-    # Get author information
-    author = db.query(User).filter(User.id == updated.author_id).first()
-    
-    # Extract author name
-    author_name = "Unknown User"
-    if author:
-        if hasattr(author, 'full_name') and author.full_name:
-            author_name = author.full_name
-        elif hasattr(author, 'first_name') and author.first_name:
-            last_name = getattr(author, 'last_name', '')
-            author_name = f"{author.first_name} {last_name}".strip()
-        elif author.email:
-            author_name = author.email.split('@')[0]
-
-    return {
-        "id": updated.id,
-        "post_id": updated.post_id,
-        "author_id": updated.author_id,
-        "author_name": author_name,
-        "content": updated.content,
-        "is_anonymous": updated.is_anonymous,
-        "created_at": updated.created_at,
-        "updated_at": updated.updated_at,
-        "like_count": forum_repo.get_response_like_count(db, response_id)
-    }
+    author_names = author_service.resolve_author_names(db, [updated.author_id])
+    return _response_to_dict(updated, author_names[updated.author_id], viewer_id=user_id)
 
 
 @router.delete("/responses/{response_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -385,19 +548,33 @@ def toggle_response_like(response_id: int, user_id: int, db: Session = Depends(g
     response = forum_repo.get_response_by_id(db, response_id)
     if not response:
         raise HTTPException(status_code=404, detail="Response not found")
+    _require_user(db, user_id)
     
-    liked = forum_repo.toggle_response_like(db, response_id, user_id)
-    new_count = forum_repo.get_response_like_count(db, response_id)
+    parent_post_id = response.post_id
+    toggled = forum_repo.toggle_response_like(db, response_id, user_id)
+    if toggled is None:
+        raise HTTPException(status_code=404, detail="Response not found")
+    liked, new_count = toggled
     
     return {
         "liked": liked,
         "like_count": new_count,
         "response_id": response_id,
-        "post_id": response.post_id,
+        "post_id": parent_post_id,
         "message": "Response liked" if liked else "Response unliked"
     }
 
 
+@router.get("/responses/liked", response_model=LikedIdsResponse)
+def get_liked_responses(
+    user_id: int,
+    ids: List[int] = Query(..., max_length=200),
+    db: Session = Depends(get_db)
+):
+    """Return which of the given response ids (?ids=1&ids=2...) the user has liked"""
+    return {"user_id": user_id, "liked_ids": forum_repo.get_liked_response_ids(db, user_id, ids)}
+
+
 # =====================================================
 # REPORTING
 # =====================================================
@@ -419,3 +596,108 @@ def report_response(response_id: int, data: ReportContent, db: Session = Depends
     if not response:
         raise HTTPException(status_code=404, detail="Response not found")
     return {"message": "Response reported successfully"}
+
+
+# =====================================================
+# MODERATION
+# =====================================================
+
+
+def _split_targets(data: ModerationAction):
+    """Split moderation targets into (post ids, response ids)"""
+    post_ids = [item.id for item in data.items if item.kind == "post"]
+    response_ids = [item.id for item in data.items if item.kind == "response"]
+    return post_ids, response_ids
+
+
+def _require_moderator(db: Session, moderator_id: int, forum_id: Optional[int] = None):
+    if not forum_repo.is_moderator(db, moderator_id, forum_id):
+        raise HTTPException(status_code=403, detail="User is not a moderator of this forum")
+
+
+@router.get("/moderation/queue", response_model=ModerationQueueResponse)
+def get_moderation_queue(
+    moderator_id: int,
+    forum_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """Reported posts and responses of the forums the user moderates, oldest report first"""
+    _require_moderator(db, moderator_id, forum_id)
+    items, next_cursor = forum_repo.get_moderation_queue(db, moderator_id, forum_id, _parse_cursor(cursor), limit)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.post("/moderation/dismiss", response_model=ModerationResult)
+def dismiss_reports(data: ModerationAction, db: Session = Depends(get_db)):
+    """Clear the reports on a batch of items; items outside the user's forums are skipped"""
+    _require_moderator(db, data.moderator_id)
+    post_ids, response_ids = _split_targets(data)
+    return forum_repo.bulk_dismiss_reports(db, data.moderator_id, post_ids, response_ids)
+
+
+@router.post("/moderation/delete", response_model=ModerationResult)
+def delete_reported_content(data: ModerationAction, db: Session = Depends(get_db)):
+    """Delete a batch of items with their responses and likes; items outside the user's forums are skipped"""
+    _require_moderator(db, data.moderator_id)
+    post_ids, response_ids = _split_targets(data)
+    return forum_repo.bulk_delete_content(db, data.moderator_id, post_ids, response_ids)
+
+
+# =====================================================
+# ADMIN
+# =====================================================
+
+
+async def _numbered_lines(chunks):
+    """Split a byte stream into (line number, text) pairs"""
+    line_no = 0
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.decode("utf-8", errors="replace")
+    if buffer:
+        yield line_no + 1, buffer.decode("utf-8", errors="replace")
+
+
+@router.post("/admin/import", response_model=ImportResult)
+async def import_forum_content(
+    request: Request,
+    admin_id: int,
+    import_id: str = Query(..., min_length=1, max_length=200),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=100, le=50000)
+):
+    """
+    Bulk import NDJSON forums, posts, responses and likes streamed in the request
+    body (format in services/forum_import.py). Batches are committed as they
+    fill up; after a failure, post the same body with the same import_id to resume.
+    """
+    db = SessionLocal()
+    try:
+        admin = await run_in_threadpool(db.get, User, admin_id)
+        if not admin or admin.role != "admin":
+            raise HTTPException(status_code=403, detail="Admin access required")
+
+        importer = ForumImporter(db, import_id, batch_size)
+        await run_in_threadpool(importer.start)
+        lines = []
+        try:
+            async for line in _numbered_lines(request.stream()):
+                lines.append(line)
+                if len(lines) >= batch_size:
+                    await run_in_threadpool(importer.add_lines, lines)
+                    lines = []
+            await run_in_threadpool(importer.add_lines, lines)
+            await run_in_threadpool(importer.flush)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Import failed after line {importer.stats.lines}: {e}. Retry with the same import_id to resume."
+            )
+        return importer.stats.as_dict()
+    finally:
+        await run_in_threadpool(db.close)
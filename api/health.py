@@ -0,0 +1,35 @@
+# api/health.py
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from core.database import get_db
+from services import llm_service
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+def liveness():
+    """The process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def readiness(db: Session = Depends(get_db)):
+    """
+    Ready to take traffic: the database answers and, where the emotion feature
+    is enabled, the model is loaded and warmed up. 503 otherwise.
+    """
+    try:
+        db.execute(text("SELECT 1"))
+        database = "ok"
+    except Exception as e:
+        database = f"error: {e}"
+
+    model = llm_service.model_status()
+    ready = database == "ok" and model["state"] in ("ready", "disabled")
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "database": database, "emotion_model": model}
+    )
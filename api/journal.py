@@ -1,27 +1,140 @@
 # routes/journal.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from core.database import get_db
-from schemas.journal import JournalCreate, JournalUpdate, JournalOut
-from services import journal_service
-from typing import List
+from schemas.journal import (
+    JournalCreate, JournalUpdate, JournalOut, JournalPaginatedResponse, JournalSearchPaginatedResponse,
+    JournalSyncResponse, JournalSyncRequest, JournalSyncResult
+)
+from core.pagination import decode_pinned_cursor, decode_rank_cursor, decode_sync_token
+from repo import search_repo, user_repo
+from services import journal_service, journal_export, journal_analytics
+from typing import List, Literal, Optional
+from datetime import date
 
 router = APIRouter(prefix="/journals", tags=["Journals"])
 
+
+def _parse_cursor(cursor: Optional[str], decode=decode_pinned_cursor):
+    """Decode a pagination cursor, rejecting malformed ones with a 400"""
+    try:
+        return decode(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _require_user(db: Session, user_id: int) -> None:
+    """404 for an unknown user_id, before it reaches a foreign key"""
+    if not user_repo.user_exists(db, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+
+
 @router.post("/", response_model=JournalOut)
 def add_journal(user_id: int, data: JournalCreate, db: Session = Depends(get_db)):
     """Create a new journal entry"""
+    _require_user(db, user_id)
     return journal_service.add_note(db, user_id, data)
 
-@router.get("/", response_model=List[JournalOut])
-def get_journals(user_id: int, db: Session = Depends(get_db)):
-    """Get all journals for a user"""
-    return journal_service.get_user_notes(db, user_id)
+@router.get("/", response_model=JournalPaginatedResponse)
+def get_journals(
+    user_id: int,
+    humor: Optional[str] = None,
+    color: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of journals for a user, pinned first then newest first,
+    optionally filtered by humor, color and creation date (inclusive).
+    Pass the returned next_cursor as ?cursor= to fetch the following page.
+    """
+    journals, next_cursor = journal_service.get_user_notes(
+        db, user_id, _parse_cursor(cursor), limit,
+        humor=humor, color=color, date_from=date_from, date_to=date_to
+    )
+    return {"journals": journals, "next_cursor": next_cursor}
+
+@router.get("/pinned", response_model=JournalPaginatedResponse)
+def get_pinned_journals(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """Get a page of pinned journals, newest first"""
+    journals, next_cursor = journal_service.get_pinned_notes(db, user_id, _parse_cursor(cursor), limit)
+    return {"journals": journals, "next_cursor": next_cursor}
 
-@router.get("/pinned", response_model=List[JournalOut])
-def get_pinned_journals(user_id: int, db: Session = Depends(get_db)):
-    """Get only pinned journals"""
-    return journal_service.get_pinned_notes(db, user_id)
+# Declared before /{journal_id} so "search" is not taken for an id
+@router.get("/search", response_model=JournalSearchPaginatedResponse)
+def search_journals(
+    user_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search across a user's journal titles and contents, best match first.
+    Pass next_cursor as ?cursor= for more results.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+
+    results, next_cursor = search_repo.search_journals(
+        db, user_id, q, _parse_cursor(cursor, decode_rank_cursor), limit
+    )
+    return {"results": results, "next_cursor": next_cursor}
+
+@router.get("/sync", response_model=JournalSyncResponse)
+def sync_journals(
+    user_id: int,
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Delta sync for offline clients: journals created or edited and tombstones of
+    journals deleted since the token (all live journals without one). Store
+    next_token and pass it as ?since= next time; sync again while has_more.
+    """
+    return journal_service.get_changes(db, user_id, _parse_cursor(since, decode_sync_token), limit)
+
+@router.post("/sync", response_model=JournalSyncResult)
+def push_journal_changes(user_id: int, data: JournalSyncRequest, db: Session = Depends(get_db)):
+    """
+    Apply a batch of offline changes (creates, edits, deletes) in one transaction,
+    last writer wins. Then GET /journals/sync to pull what changed on the server.
+    """
+    _require_user(db, user_id)
+    return journal_service.apply_changes(db, user_id, data.changes)
+
+@router.get("/export")
+def export_journals(
+    user_id: int,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    include_rollups: bool = False
+):
+    """
+    Download all of a user's journals as NDJSON or CSV, streamed row by row.
+    NDJSON exports can append the daily humor rollups (include_rollups=true).
+    """
+    if include_rollups and export_format == "csv":
+        raise HTTPException(status_code=400, detail="Humor rollups are only exported as NDJSON")
+
+    if export_format == "csv":
+        body, media_type = journal_export.stream_csv(user_id), "text/csv"
+    else:
+        body, media_type = journal_export.stream_ndjson(user_id, include_rollups), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="journals-{user_id}.{export_format}"'}
+    )
 
 # NEW ROUTE: Get single journal by ID
 @router.get("/{journal_id}", response_model=JournalOut)
@@ -65,6 +178,25 @@ def delete_journal(journal_id: int, db: Session = Depends(get_db)):
     return {"deleted": True}
 
 @router.get("/report/humor")
-def humor_stats(user_id: int, db: Session = Depends(get_db)):
-    """Get humor statistics"""
-    return journal_service.humor_report(db, user_id)
+def humor_stats(
+    user_id: int,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    granularity: Literal["day", "week", "month"] = "day",
+    db: Session = Depends(get_db)
+):
+    """Get humor statistics, optionally between two dates (inclusive), per day, week or month"""
+    return journal_service.humor_report(db, user_id, date_from, date_to, granularity)
+
+@router.get("/report/analytics")
+def mood_analytics(
+    user_id: int,
+    utc_offset: int = Query(0, ge=-720, le=840, description="Minutes east of UTC, for days and hours"),
+    days: int = Query(90, ge=1, le=366, description="Days of rolling distributions to return"),
+    db: Session = Depends(get_db)
+):
+    """
+    Mood analytics: rolling 7- and 30-day humor distributions, current and
+    longest streaks per humor, weekday and hour-of-day heatmaps and change points
+    """
+    return journal_analytics.mood_analytics(db, user_id, utc_offset, days)
@@ -0,0 +1,31 @@
+# backfill_humor_rollup.py
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, init_db
+from repo import journal_repo
+
+
+def backfill_humor_rollup():
+    """Rebuild the journal_humor_daily rollup behind the humor report from existing journals"""
+    
+    init_db()
+    db: Session = SessionLocal()
+    
+    try:
+        print("🚀 Rebuilding journal humor rollup...")
+        print("="*50)
+        
+        cells = journal_repo.rebuild_humor_rollup(db)
+        
+        print("="*50)
+        print(f"✅ Wrote {cells} (user, day, humor) counts")
+        
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_humor_rollup()
@@ -0,0 +1,101 @@
+# bench_emotion_backends.py
+# Compares the emotion inference backends on CPU: load time, single-text
+# latency, batched throughput and memory. Each backend runs in its own Python
+# process so the RSS figures are not polluted by the other runtime.
+# Needs the runtimes of the backends compared and the ONNX export
+# (python export_emotion_onnx.py).
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from services.emotion_backends import BACKENDS, create_backend
+
+
+TEXTS = [
+    "I can't sleep before exams, my heart keeps racing.",
+    "Work has drained me completely, I don't care about anything anymore.",
+    "I miss my friends, the evenings feel so empty.",
+    "Why does nobody listen to me? It makes me furious.",
+    "Today was calm, I went for a walk and felt fine.",
+    "I'm scared of what the doctor will say tomorrow.",
+]
+
+
+def rss_mib() -> float:
+    """Current resident set size (Linux), else the peak"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mib()
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def measure(name: str, requests: int, batch_size: int) -> dict:
+    """Figures of one backend, measured in the current process"""
+    baseline = rss_mib()
+    start = time.perf_counter()
+    backend = create_backend(name)
+    backend.load()
+    backend.predict(TEXTS)  # Warm-up
+    load_seconds = time.perf_counter() - start
+    loaded = rss_mib()
+
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        backend.predict([TEXTS[i % len(TEXTS)]])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    batch = [TEXTS[i % len(TEXTS)] for i in range(batch_size)]
+    rounds = max(1, requests // batch_size)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        backend.predict(batch)
+    throughput = rounds * batch_size / (time.perf_counter() - start)
+
+    return {
+        "backend": name,
+        "load_s": load_seconds,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "texts_per_s": throughput,
+        "rss_model_mib": loaded - baseline,
+        "rss_peak_mib": peak_rss_mib(),
+    }
+
+
+def run(backends=tuple(BACKENDS), requests: int = 200, batch_size: int = 32):
+    print(f"{requests} single-text requests, then batches of {batch_size}")
+    print(f"{'backend':<13} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'texts/s':>9} {'model MiB':>10} {'peak MiB':>9}")
+    print("-" * 70)
+    for name in backends:
+        child = subprocess.run(
+            [sys.executable, __file__, "--child", name, str(requests), str(batch_size)],
+            capture_output=True, text=True
+        )
+        if child.returncode != 0:
+            print(f"{name:<13} ❌ {child.stderr.strip().splitlines()[-1] if child.stderr.strip() else 'failed'}")
+            continue
+        r = json.loads(child.stdout.strip().splitlines()[-1])
+        print(f"{name:<13} {r['load_s']:7.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['texts_per_s']:9.1f} "
+              f"{r['rss_model_mib']:10.0f} {r['rss_peak_mib']:9.0f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        print(json.dumps(measure(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))))
+    else:
+        # python bench_emotion_backends.py [requests] [batch size]
+        run(requests=int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+            batch_size=int(sys.argv[2]) if len(sys.argv) > 2 else 32)
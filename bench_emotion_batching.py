@@ -0,0 +1,63 @@
+# bench_emotion_batching.py
+# Measures emotion inference throughput on CPU under concurrent load, with the
+# micro-batching scheduler capped at different batch sizes (1 = one forward
+# pass per request). Calls the model directly, bypassing the result cache.
+# Needs torch, transformers and the model weights.
+import asyncio
+import sys
+import time
+from services import llm_service
+from services.inference_scheduler import BatchScheduler
+
+
+TEXTS = [
+    "I can't sleep before exams, my heart keeps racing.",
+    "Work has drained me completely, I don't care about anything anymore.",
+    "I miss my friends, the evenings feel so empty.",
+    "Why does nobody listen to me? It makes me furious.",
+    "Today was calm, I went for a walk and felt fine.",
+    "I'm scared of what the doctor will say tomorrow.",
+]
+
+
+async def measure(max_batch_size: int, requests: int, concurrency: int, max_wait_ms: float):
+    """Return (texts per second, p50 ms, p95 ms, average batch size)"""
+    scheduler = BatchScheduler(llm_service.classify_emotions, max_batch_size, max_wait_ms)
+    await scheduler.start()
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await scheduler.submit(TEXTS[i % len(TEXTS)])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    seconds = time.perf_counter() - start
+    await scheduler.stop()
+    latencies.sort()
+    return (
+        requests / seconds,
+        latencies[len(latencies) // 2],
+        latencies[int(len(latencies) * 0.95)],
+        scheduler.average_batch_size,
+    )
+
+
+def run(requests: int = 512, concurrency: int = 64, max_wait_ms: float = 10.0):
+    print("🔥 Loading model...")
+    llm_service.classify_emotions(TEXTS)
+
+    print(f"{requests} requests, {concurrency} concurrent, max wait {max_wait_ms:g} ms")
+    print(f"{'max batch':>9} {'texts/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'avg batch':>10}")
+    print("-" * 48)
+    for max_batch_size in (1, 8, 32):
+        rate, p50, p95, average = asyncio.run(measure(max_batch_size, requests, concurrency, max_wait_ms))
+        print(f"{max_batch_size:9} {rate:9.1f} {p50:8.1f} {p95:8.1f} {average:10.1f}")
+
+
+if __name__ == "__main__":
+    # python bench_emotion_batching.py [requests] [concurrency]
+    run(*(int(arg) for arg in sys.argv[1:3]))
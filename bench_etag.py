@@ -0,0 +1,81 @@
+# bench_etag.py
+# Measures what conditional GETs save for polling clients: bytes on the wire and
+# server CPU per poll, with and without If-None-Match, on a throwaway database.
+import os
+import sys
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from fastapi.testclient import TestClient
+from core.database import SessionLocal
+from models.user import User
+from models.forum import Forum, ForumModerator, Post, Response
+from repo import forum_repo
+import main
+
+
+def seed(posts: int = 200, responses_per_post: int = 20):
+    """Fill the throwaway database with one busy forum"""
+    db = SessionLocal()
+    users = [User(email=f"bench{i}@sahemind.com", password_hash="x") for i in range(20)]
+    db.add_all(users)
+    db.flush()
+    forum = Forum(name="Bench", thematic="bench")
+    db.add(forum)
+    db.flush()
+    db.add(ForumModerator(forum_id=forum.id, user_id=users[0].id))
+    for p in range(posts):
+        post = Post(forum_id=forum.id, author_id=users[p % 20].id, title=f"Post {p}",
+                    content="Lorem ipsum dolor sit amet " * 20, is_anonymous=p % 2 == 0)
+        db.add(post)
+        db.flush()
+        db.add_all([
+            Response(post_id=post.id, author_id=users[r % 20].id, content="Reply " * 15)
+            for r in range(responses_per_post)
+        ])
+    db.commit()
+    forum_id = forum.id
+    forum_repo.reconcile_counters(db)
+    db.close()
+    return forum_id
+
+
+def measure(client: TestClient, url: str, polls: int, conditional: bool):
+    """Return (bytes per poll, CPU ms per poll, status of the last poll)"""
+    etag = client.get(url).headers.get("etag")
+    headers = {"If-None-Match": etag} if conditional else {}
+    total_bytes = 0
+    status = None
+    start = time.process_time()
+    for _ in range(polls):
+        r = client.get(url, headers=headers)
+        total_bytes += len(r.content)
+        status = r.status_code
+    cpu_ms = (time.process_time() - start) * 1000 / polls
+    return total_bytes / polls, cpu_ms, status
+
+
+def run(polls: int = 200):
+    forum_id = seed()
+    client = TestClient(main.app)
+    endpoints = [
+        "/forums/",
+        f"/forums/{forum_id}/posts?limit=50",
+        "/forums/posts/1/responses?limit=100",
+        "/forums/posts/1/thread?limit=100",
+    ]
+
+    print(f"{'endpoint':40} {'mode':12} {'bytes/poll':>12} {'cpu ms/poll':>12} {'status':>7}")
+    print("-" * 87)
+    for url in endpoints:
+        for conditional in (False, True):
+            size, cpu_ms, status = measure(client, url, polls, conditional)
+            mode = "If-None-Match" if conditional else "plain"
+            print(f"{url:40} {mode:12} {size:12.0f} {cpu_ms:12.3f} {status:>7}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
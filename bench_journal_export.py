@@ -0,0 +1,105 @@
+# bench_journal_export.py
+# Checks that journal exports stream in bounded memory: peak Python allocations
+# (tracemalloc) while reading a whole export should not grow with the number of
+# journals. Runs on a throwaway database.
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+import asyncio
+from sqlalchemy import insert
+from core.database import SessionLocal
+from models.user import User
+from models.journal import Journal
+from repo import journal_repo
+import main
+
+
+HUMORS = ["sad", "anxious", "calm", "happy", "angry"]
+
+
+def seed(user_id: int, journals: int):
+    """Give a user `journals` entries of a few hundred bytes each"""
+    db = SessionLocal()
+    db.execute(insert(Journal), [
+        {
+            "user_id": user_id,
+            "humor": HUMORS[i % len(HUMORS)],
+            "title": f"Entry {i}",
+            "content": "Today I wrote about my day, again. " * 10,
+            "is_pinned": i % 50 == 0,
+        }
+        for i in range(journals)
+    ])
+    db.commit()
+    journal_repo.rebuild_humor_rollup(db, user_id)
+    db.close()
+
+
+async def _download(path: str, query: str) -> int:
+    """
+    Call the ASGI app directly and discard body chunks as they arrive
+    (TestClient would buffer the whole body). Returns the number of bytes.
+    """
+    total = 0
+    requested = False
+    never = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            await never.wait()  # The client never disconnects
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal total
+        if message["type"] == "http.response.body":
+            total += len(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "", "headers": [],
+        "client": ("bench", 0), "server": ("bench", 80),
+    }
+    await main.app(scope, receive, send)
+    return total
+
+
+def measure(query: str):
+    """Return (bytes, seconds, peak KiB allocated while streaming the export)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = asyncio.run(_download("/journals/export", query))
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, seconds, peak / 1024
+
+
+def run(sizes=(1_000, 10_000, 50_000)):
+    db = SessionLocal()
+    users = [User(email=f"export{i}@sahemind.com", password_hash="x") for i in range(len(sizes))]
+    db.add_all(users)
+    db.commit()
+    user_ids = [user.id for user in users]
+    db.close()
+
+    print(f"{'journals':>9} {'format':22} {'MB':>8} {'seconds':>8} {'peak KiB':>9}")
+    print("-" * 60)
+    for user_id, size in zip(user_ids, sizes):
+        seed(user_id, size)
+        for query in ("format=ndjson", "format=ndjson&include_rollups=true", "format=csv"):
+            total, seconds, peak = measure(f"user_id={user_id}&{query}")
+            label = query.replace("format=", "").replace("&include_rollups=true", "+rollups")
+            print(f"{size:9,} {label:22} {total / 1e6:8.1f} {seconds:8.2f} {peak:9,.0f}")
+
+
+if __name__ == "__main__":
+    run(tuple(int(size) for size in sys.argv[1:]) or (1_000, 10_000, 50_000))
@@ -0,0 +1,48 @@
+# bench_live.py
+# Fan-out cost of the live broker: memory per idle subscriber and time to
+# deliver one event to every subscriber of a forum (10k by default).
+import asyncio
+import sys
+import time
+import tracemalloc
+from core.broker import Broker, LocalBackend, COALESCE, DROP_OLDEST
+
+
+async def bench(subscribers: int, events: int, policy: str):
+    broker = Broker(LocalBackend())
+    await broker.start()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    subscriptions = [broker.subscribe(1, policy=policy) for _ in range(subscribers)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    per_subscriber = sum(stat.size_diff for stat in after.compare_to(before, "filename")) / subscribers
+
+    results = {}
+    for label, make_event in (
+        ("distinct", lambda i: {"type": "post_created", "forum_id": 1, "post_id": i}),
+        ("same key", lambda i: {"type": "post_like", "key": "post_like:1", "forum_id": 1, "post_id": 1, "like_count": i}),
+    ):
+        start = time.perf_counter()
+        for i in range(events):
+            broker.publish(make_event(i))
+        results[label] = (time.perf_counter() - start) * 1000 / events
+
+    queued = max(len(s._events) for s in subscriptions)
+    dropped = max(s.dropped for s in subscriptions)
+    await broker.stop()
+    return per_subscriber, results, queued, dropped
+
+
+def run(subscribers: int = 10_000, events: int = 300):
+    print(f"{subscribers} idle subscribers, {events} events of each kind")
+    print(f"{'policy':12} {'bytes/sub':>10} {'ms/event distinct':>18} {'ms/event same key':>18} {'queued':>7} {'dropped':>8}")
+    print("-" * 78)
+    for policy in (DROP_OLDEST, COALESCE):
+        per_subscriber, results, queued, dropped = asyncio.run(bench(subscribers, events, policy))
+        print(f"{policy:12} {per_subscriber:10.0f} {results['distinct']:18.3f} {results['same key']:18.3f} {queued:7} {dropped:8}")
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:3]))
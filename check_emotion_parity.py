@@ -0,0 +1,55 @@
+# check_emotion_parity.py
+# Checks that a backend agrees with the default transformers pipeline: runs
+# both on the same texts and compares the emotion probabilities after
+# label_mapping. Fails (exit code 1) when any probability differs by more than
+# the tolerance. Needs both backends installed and the ONNX export.
+import sys
+from services import llm_service
+from services.emotion_backends import create_backend
+
+TOLERANCE = 0.05
+
+TEXTS = [
+    "I can't sleep before exams, my heart keeps racing.",
+    "Work has drained me completely, I don't care about anything anymore.",
+    "I miss my friends, the evenings feel so empty.",
+    "Why does nobody listen to me? It makes me furious.",
+    "Today was calm, I went for a walk and felt fine.",
+    "I'm scared of what the doctor will say tomorrow.",
+    "ok",
+    "My manager yelled at me again. " * 120,  # Longer than 512 tokens: truncated
+]
+
+
+def emotions_of(backend_name: str):
+    backend = create_backend(backend_name)
+    backend.load()
+    return [llm_service._map_emotions(scores) for scores in backend.predict(TEXTS)]
+
+
+def check_parity(candidate: str = "onnx", tolerance: float = TOLERANCE) -> bool:
+    """True if every emotion probability of candidate is within tolerance of the reference"""
+    print(f"🔍 Comparing {candidate} against transformers on {len(TEXTS)} texts (tolerance {tolerance})")
+    print("="*50)
+    reference = emotions_of("transformers")
+    results = emotions_of(candidate)
+
+    worst = 0.0
+    for text, expected, actual in zip(TEXTS, reference, results):
+        diff = max(abs(expected.get(e, 0.0) - actual.get(e, 0.0)) for e in llm_service.REQUIRED_EMOTIONS)
+        worst = max(worst, diff)
+        mark = "✅" if diff <= tolerance else "❌"
+        top = f"{max(expected, key=expected.get)}/{max(actual, key=actual.get)}"
+        print(f"{mark} max diff {diff:.4f}  top {top:<20}  {text[:50]!r}")
+
+    print("="*50)
+    ok = worst <= tolerance
+    print(f"{'✅' if ok else '❌'} Worst difference {worst:.4f}")
+    return ok
+
+
+if __name__ == "__main__":
+    # python check_emotion_parity.py [backend] [tolerance]
+    candidate = sys.argv[1] if len(sys.argv) > 1 else "onnx"
+    tolerance = float(sys.argv[2]) if len(sys.argv) > 2 else TOLERANCE
+    sys.exit(0 if check_parity(candidate, tolerance) else 1)
@@ -0,0 +1,81 @@
+# check_forum_query_counts.py
+# Checks that the forum directory endpoints do not issue a query per forum:
+# counts the SQL statements of GET /forums/ and GET /forums/{id} with 1 forum,
+# then again with many, on a throwaway database. Exits with code 1 when the
+# counts differ.
+import os
+import sys
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'check.db')}"
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from core.database import SessionLocal, engine
+from models.user import User
+from models.forum import Forum, ForumModerator, Post
+import main
+
+
+_statements = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    _statements.append(statement)
+
+
+def add_forums(count: int, start: int = 0, posts_per_forum: int = 5):
+    """Add forums, each with two moderators and a few posts"""
+    db = SessionLocal()
+    users = db.query(User).all()
+    if not users:
+        users = [User(email=f"check{i}@sahemind.com", password_hash="x") for i in range(5)]
+        db.add_all(users)
+        db.flush()
+    for f in range(start, start + count):
+        forum = Forum(name=f"Forum {f}", thematic="check")
+        db.add(forum)
+        db.flush()
+        db.add_all([ForumModerator(forum_id=forum.id, user_id=user.id) for user in users[:2]])
+        db.add_all([
+            Post(forum_id=forum.id, author_id=users[p % len(users)].id, title=f"Post {p}", content="Content")
+            for p in range(posts_per_forum)
+        ])
+    db.commit()
+    db.close()
+
+
+def count_statements(client: TestClient, url: str) -> int:
+    """Number of SQL statements issued while serving one GET"""
+    _statements.clear()
+    response = client.get(url)
+    assert response.status_code == 200, f"{url} answered {response.status_code}"
+    return len(_statements)
+
+
+def check_query_counts(forums: int = 50) -> bool:
+    """True if both endpoints cost the same statements for 1 and for `forums` forums"""
+    client = TestClient(main.app)
+    print(f"🔍 Counting SQL statements with 1 forum, then {forums}")
+    print("="*50)
+
+    add_forums(1)
+    single = {url: count_statements(client, url) for url in ("/forums/", "/forums/1")}
+    add_forums(forums - 1, start=1)
+    many = {url: count_statements(client, url) for url in ("/forums/", f"/forums/{forums}")}
+
+    ok = True
+    for (url, one), count in zip(single.items(), many.values()):
+        same = one == count
+        ok = ok and same
+        print(f"{'✅' if same else '❌'} GET {url:<12} 1 forum: {one} statements, {forums} forums: {count}")
+
+    print("="*50)
+    return ok
+
+
+if __name__ == "__main__":
+    # python check_forum_query_counts.py [forums]
+    sys.exit(0 if check_query_counts(*(int(arg) for arg in sys.argv[1:2])) else 1)
@@ -0,0 +1,218 @@
+# core/broker.py
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Set
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+
+# =====================================================
+# LIVE EVENTS PUB/SUB
+# =====================================================
+# Repos publish small events ({"type", "forum_id", ids, counts}) after commit;
+# the broker fans them out to per-subscriber bounded queues on the event loop.
+# Subscribers are SSE streams (see api/forum.py), which refetch details with
+# ETags when they need more than the event carries.
+
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+
+HEARTBEAT_SECONDS = 15.0
+
+
+class Subscription:
+    """
+    Bounded event queue of one subscriber. Only touched from the event loop.
+    With the coalesce policy a newer event replaces a pending one with the same
+    key (e.g. successive like counts of one post); when the queue is full the
+    oldest event is dropped either way and counted in `dropped`.
+    """
+
+    def __init__(self, forum_id: int, maxsize: int = 100, policy: str = COALESCE):
+        self.forum_id = forum_id
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        # Queue slots hold either an event or the coalesce key of an event in _latest
+        self._events: deque = deque()
+        self._latest: Dict[str, dict] = {}
+        self._ready = asyncio.Event()
+
+    def put(self, event: dict) -> None:
+        key = event.get("key") if self.policy == COALESCE else None
+        if key is not None and key in self._latest:
+            self._latest[key] = event
+            return
+        if len(self._events) >= self.maxsize:
+            dropped = self._events.popleft()
+            if isinstance(dropped, str):
+                del self._latest[dropped]
+            self.dropped += 1
+        if key is not None:
+            self._latest[key] = event
+            self._events.append(key)
+        else:
+            self._events.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event, or None if nothing arrived within timeout (heartbeat time)"""
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        slot = self._events.popleft()
+        return self._latest.pop(slot) if isinstance(slot, str) else slot
+
+
+class LocalBackend:
+    """In-process backend: events only reach subscribers of the publishing worker"""
+
+    async def start(self, deliver: Callable[[dict], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, event: dict) -> None:
+        self._deliver(event)
+
+    async def stop(self) -> None:
+        pass
+
+
+class DatabaseBackend:
+    """
+    Shares events between uvicorn workers through a live_events table in the
+    application database: publish inserts a row, every worker polls for new rows.
+    """
+
+    def __init__(self, poll_interval: float = 0.5, retention_seconds: float = 300.0):
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Callable[[dict], None]) -> None:
+        from core.database import engine
+
+        self._engine = engine
+        self._deliver = deliver
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS live_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )
+            """))
+            self._last_id = conn.execute(text("SELECT coalesce(max(id), 0) FROM live_events")).scalar()
+        self._task = asyncio.create_task(self._poll())
+
+    def publish(self, event: dict) -> None:
+        with self._engine.begin() as conn:
+            conn.execute(
+                text("INSERT INTO live_events (created_at, payload) VALUES (:created_at, :payload)"),
+                {"created_at": time.time(), "payload": json.dumps(event)}
+            )
+
+    def _fetch(self) -> list:
+        with self._engine.begin() as conn:
+            rows = conn.execute(
+                text("SELECT id, payload FROM live_events WHERE id > :last_id ORDER BY id"),
+                {"last_id": self._last_id}
+            ).all()
+            conn.execute(
+                text("DELETE FROM live_events WHERE created_at < :cutoff"),
+                {"cutoff": time.time() - self.retention_seconds}
+            )
+        return rows
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                for event_id, payload in await run_in_threadpool(self._fetch):
+                    self._last_id = event_id
+                    self._deliver(json.loads(payload))
+            except Exception as e:
+                print(f"Error polling live events: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+
+class Broker:
+    """Routes published events to the subscriptions of their forum"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalBackend()
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        await self.backend.start(self._deliver)
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+        self._loop = None
+
+    def subscribe(self, forum_id: int, maxsize: int = 100, policy: str = COALESCE) -> Subscription:
+        subscription = Subscription(forum_id, maxsize, policy)
+        self._subscribers.setdefault(forum_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.forum_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.forum_id]
+
+    def subscriber_count(self, forum_id: Optional[int] = None) -> int:
+        if forum_id is not None:
+            return len(self._subscribers.get(forum_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, event: dict) -> None:
+        """
+        Publish an event from any thread. A no-op until the broker is started
+        (e.g. in scripts), and never raises into the caller's write path.
+        """
+        if self._loop is None:
+            return
+        try:
+            self.backend.publish(event)
+        except Exception as e:
+            print(f"Error publishing live event: {e}")
+
+    def _deliver(self, event: dict) -> None:
+        """Thread-safe entry point for backends; fan-out happens on the loop"""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fanout(event)
+        else:
+            loop.call_soon_threadsafe(self._fanout, event)
+
+    def _fanout(self, event: dict) -> None:
+        for subscription in tuple(self._subscribers.get(event.get("forum_id"), ())):
+            subscription.put(event)
+
+
+def _backend_from_env():
+    # LIVE_BACKEND=database when running several uvicorn workers
+    if os.getenv("LIVE_BACKEND", "local") == "database":
+        return DatabaseBackend()
+    return LocalBackend()
+
+
+broker = Broker(_backend_from_env())
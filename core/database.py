@@ -1,12 +1,32 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import sessionmaker, declarative_base
+from core.ranking import hot_score
 
-DATABASE_URL = "sqlite:///./app.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 
 engine = create_engine(
     DATABASE_URL, connect_args={"check_same_thread": False}
 )
 
+
+
+@event.listens_for(engine, "connect")
+def _register_sql_functions(dbapi_connection, connection_record):
+    """Expose Python helpers to SQL on every new SQLite connection"""
+    dbapi_connection.create_function("hot_score", 3, hot_score)
+
+
+@event.listens_for(engine, "connect")
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores FOREIGN KEY clauses (and ON DELETE CASCADE) unless enabled per connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -18,3 +38,30 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def init_db():
+    """
+    Create missing tables, then add any columns and indexes declared on tables
+    that already existed (create_all only builds those together with their table).
+    New columns must carry a server_default so existing rows get a value.
+    """
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                try:
+                    index.create(bind=engine)
+                except IntegrityError:
+                    # Existing rows violate a new unique index; reconcile_counters.py removes them
+                    print(f"⚠️  Could not create {index.name}: duplicate rows, run reconcile_counters.py")
@@ -0,0 +1,99 @@
+# core/pagination.py
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def _encode(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str, parts: int = 2) -> Tuple[str, ...]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+    if len(values) != parts:
+        raise ValueError("Invalid cursor")
+    return tuple(values)
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor string"""
+    return _encode(f"{created_at.isoformat()}|{row_id}")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed"""
+    if not cursor:
+        return None
+    try:
+        created_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    """Encode a (rank, rowid) position of a ranked search as an opaque cursor string"""
+    return _encode(f"{rank!r}|{row_id}")
+
+
+def decode_rank_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    """Decode a cursor produced by encode_rank_cursor. Raises ValueError if malformed"""
+    if not cursor:
+        return None
+    try:
+        rank, row_id = _decode(cursor)
+        return float(rank), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def encode_pinned_cursor(is_pinned: bool, created_at: str, row_id: int) -> str:
+    """
+    Encode an (is_pinned, created_at, id) keyset position as an opaque cursor string.
+    created_at is the value exactly as stored, so it compares equal to its own row.
+    """
+    return _encode(f"{int(is_pinned)}|{created_at}|{row_id}")
+
+
+def decode_pinned_cursor(cursor: Optional[str]) -> Optional[Tuple[bool, str, int]]:
+    """Decode a cursor produced by encode_pinned_cursor. Raises ValueError if malformed"""
+    if not cursor:
+        return None
+    try:
+        is_pinned, created_at, row_id = _decode(cursor, parts=3)
+        return bool(int(is_pinned)), created_at, int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def encode_sync_token(updated_at: str, row_id: int) -> str:
+    """
+    Encode an (updated_at, id) position in a user's change stream as an opaque
+    sync token. updated_at is the value exactly as stored, like pinned cursors.
+    """
+    return _encode(f"{updated_at}|{row_id}")
+
+
+def decode_sync_token(token: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Decode a token produced by encode_sync_token. Raises ValueError if malformed"""
+    if not token:
+        return None
+    try:
+        updated_at, row_id = _decode(token)
+        datetime.fromisoformat(updated_at)
+        return updated_at, int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid sync token")
+
+
+def next_cursor(rows: list, limit: int, key=lambda row: row) -> Tuple[list, Optional[str]]:
+    """
+    Split a page fetched with limit + 1 rows into (page, next_cursor).
+    `key` maps a row to the object carrying created_at and id.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = key(page[-1])
+    return page, encode_cursor(last.created_at, last.id)
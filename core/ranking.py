@@ -0,0 +1,32 @@
+# core/ranking.py
+from datetime import datetime
+from typing import Optional, Union
+
+# "Hot" ranking in the style of Hacker News:
+#   score = (likes + RESPONSE_WEIGHT * responses + 1) / (age_hours + 2) ** GRAVITY
+# Scores only ever shrink with age, so they are stored on posts, refreshed
+# whenever a post's counters change, and periodically re-decayed in bulk.
+
+GRAVITY = 1.8
+RESPONSE_WEIGHT = 2.0
+HOT_WINDOW_DAYS = 7  # Older posts drop to a score of 0 and leave the hot feed
+
+
+def hot_score(
+    like_count: int,
+    response_count: int,
+    created_at: Union[datetime, str, None],
+    now: Optional[datetime] = None
+) -> float:
+    """Time-decayed engagement score of a post (created_at is naive UTC)"""
+    now = now or datetime.utcnow()
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    created_at = created_at or now
+
+    age_hours = max((now - created_at).total_seconds() / 3600, 0.0)
+    if age_hours > HOT_WINDOW_DAYS * 24:
+        return 0.0
+
+    engagement = (like_count or 0) + RESPONSE_WEIGHT * (response_count or 0) + 1
+    return engagement / (age_hours + 2) ** GRAVITY
@@ -0,0 +1,64 @@
+# export_emotion_onnx.py
+# Exports the emotion model to ONNX and quantizes its weights to int8
+# (dynamic quantization: activations are quantized on the fly, no calibration
+# data needed). Writes model.int8.onnx, config.json and tokenizer.json to
+# EMOTION_ONNX_DIR, where the onnx backend (EMOTION_BACKEND=onnx) loads them.
+# Needs torch, transformers and onnxruntime; run check_emotion_parity.py after.
+import os
+import sys
+from services.emotion_backends import EMOTION_MODEL_NAME, EMOTION_ONNX_DIR, ONNX_MODEL_FILE
+
+OPSET = 17
+
+
+def export_emotion_onnx(out_dir: str = EMOTION_ONNX_DIR, keep_fp32: bool = False):
+    """Export, quantize and save the model with its config and tokenizer"""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(out_dir, exist_ok=True)
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    int8_path = os.path.join(out_dir, ONNX_MODEL_FILE)
+
+    print(f"🚀 Exporting {EMOTION_MODEL_NAME}...")
+    print("="*50)
+
+    tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(EMOTION_MODEL_NAME)
+    model.eval()
+    sample = tokenizer(["I feel calm today.", "Exams are next week and I can't sleep."], padding=True, return_tensors="pt")
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=OPSET,
+        )
+    print(f"✅ Exported {fp32_path} ({os.path.getsize(fp32_path) / 2**20:.1f} MiB)")
+
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"✅ Quantized {int8_path} ({os.path.getsize(int8_path) / 2**20:.1f} MiB)")
+
+    # The backend only needs tokenizer.json and config.json (labels, pad token)
+    tokenizer.save_pretrained(out_dir)
+    model.config.save_pretrained(out_dir)
+    if not keep_fp32:
+        os.remove(fp32_path)
+
+    print("="*50)
+    print(f"Done. Serve it with EMOTION_BACKEND=onnx EMOTION_ONNX_DIR={out_dir}")
+
+
+if __name__ == "__main__":
+    # python export_emotion_onnx.py [out_dir] [--keep-fp32]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    export_emotion_onnx(*args[:1], keep_fp32="--keep-fp32" in sys.argv)
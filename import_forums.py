@@ -0,0 +1,66 @@
+# import_forums.py
+import argparse
+import os
+import sys
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, init_db, engine
+from repo import forum_repo, search_repo
+from services.forum_import import ForumImporter, DEFAULT_BATCH_SIZE
+
+
+def print_progress(stats):
+    print(f"📦 Line {stats.lines:,}: {sum(stats.inserted.values()):,} rows "
+          f"({stats.rows_per_second:,.0f} rows/s), {stats.skipped:,} skipped")
+
+
+def import_forums(path: str, import_id: str, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Bulk import forums, posts, responses and likes from an NDJSON file
+    (format in services/forum_import.py). Re-run with the same import id to
+    resume after a failure.
+    """
+
+    init_db()
+    search_repo.init_forum_search(engine)
+    forum_repo.init_forum_versions(engine)
+    db: Session = SessionLocal()
+
+    try:
+        print(f"🚀 Importing {path} as '{import_id}'...")
+        print("="*50)
+
+        importer = ForumImporter(db, import_id, batch_size, on_batch=print_progress)
+        source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        with source:
+            stats = importer.run(source)
+
+        print("="*50)
+        if stats.resumed_from:
+            print(f"ℹ️  Resumed after line {stats.resumed_from:,}")
+        for kind, count in stats.inserted.items():
+            print(f"✅ {kind}: {count:,} inserted")
+        if stats.skipped:
+            print(f"⚠️  {stats.skipped:,} records skipped")
+            for error in stats.errors:
+                print(f"   {error}")
+        print(f"⏱️  {stats.seconds:.1f}s, {stats.rows_per_second:,.0f} rows/s")
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        print(f"ℹ️  Re-run with --import-id {import_id} to resume from the last committed batch")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    # python import_forums.py dump.ndjson [--import-id dump] [--batch-size 5000]
+    parser = argparse.ArgumentParser(description="Bulk import forum content from NDJSON")
+    parser.add_argument("path", help="NDJSON file, or - for stdin")
+    parser.add_argument("--import-id", help="Checkpoint name (defaults to the file name)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    if args.path == "-" and not args.import_id:
+        parser.error("--import-id is required when reading stdin")
+    import_forums(args.path, args.import_id or os.path.basename(args.path), args.batch_size)
@@ -1,19 +1,61 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from core.database import Base, engine
+from core.database import init_db, engine, SessionLocal
+from core.broker import broker
 from api import auth
 from api import journal
 from api import forum
 from api import volunteer
+from api import emotion
+from api import health
+from repo import search_repo, forum_repo
+from services import forum_tasks, journal_tasks
+from services import llm_service
+from services.llm_service import emotion_scheduler
+from services.emotion_cache import purge_emotion_cache_loop
 
-Base.metadata.create_all(bind=engine)
+init_db()
+search_repo.init_forum_search(engine)
+search_repo.init_journal_search(engine)
+forum_repo.init_forum_versions(engine)
+# Reports filed before reported_at existed need a moderation queue position
+with SessionLocal() as db:
+    forum_repo.backfill_reported_at(db)
 
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await broker.start()
+    background_tasks = [
+        asyncio.create_task(forum_tasks.hot_score_decay_loop()),
+        asyncio.create_task(forum_tasks.purge_deleted_posts_loop()),
+        asyncio.create_task(journal_tasks.purge_tombstones_loop()),
+    ]
+    if llm_service.EMOTION_ENABLED:
+        # The model loads in the background; /health/ready turns 200 once it is warm
+        llm_service.start_warmup()
+        await emotion_scheduler.start()
+        background_tasks.append(asyncio.create_task(purge_emotion_cache_loop()))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    if llm_service.EMOTION_ENABLED:
+        await emotion_scheduler.stop()
+    await broker.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.include_router(auth.router)
 app.include_router(journal.router)
 app.include_router(forum.router)
 app.include_router(volunteer.router)
+app.include_router(health.router)
+if llm_service.EMOTION_ENABLED:
+    app.include_router(emotion.router)
 
 
 
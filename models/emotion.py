@@ -0,0 +1,17 @@
+# models/emotion.py
+from sqlalchemy import Column, String, Text, DateTime, Index
+from datetime import datetime
+from core.database import Base
+
+
+class EmotionCacheEntry(Base):
+    """Second tier of the emotion result cache (see services/emotion_cache.py)"""
+    __tablename__ = "emotion_cache"
+    __table_args__ = (
+        Index("ix_emotion_cache_created", "created_at"),
+    )
+
+    key = Column(String, primary_key=True)  # sha256 of model version + normalized text
+    model_version = Column(String, nullable=False)
+    emotions = Column(Text, nullable=False)  # JSON emotion -> probability
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,5 +1,5 @@
 # models/forum.py
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, Float, text
 from sqlalchemy.orm import relationship, backref
 from datetime import datetime
 from core.database import Base
@@ -14,6 +14,7 @@ class Forum(Base):
     thematic = Column(String, nullable=False)  # Category/topic
     created_at = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Boolean, default=True)
+    content_version = Column(Integer, default=0, server_default="0", nullable=False)  # Bumped by triggers on any content change
     
     # Relationships with cascade delete
     moderators = relationship(
@@ -45,6 +46,17 @@ class ForumModerator(Base):
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Keyset pagination: forum feed and per-user posts, newest first
+        Index("ix_posts_forum_created_id", "forum_id", "created_at", "id"),
+        Index("ix_posts_author_created_id", "author_id", "created_at", "id"),
+        # sort=hot feed, highest score first
+        Index("ix_posts_forum_hot_id", "forum_id", "hot_score", "id"),
+        # Moderation queue: only reported rows are indexed
+        Index("ix_posts_reported_queue", "forum_id", "reported_at", "id", sqlite_where=text("is_reported = 1")),
+        # Purge queue: only soft-deleted rows are indexed
+        Index("ix_posts_deleted", "id", sqlite_where=text("deleted_at IS NOT NULL")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     forum_id = Column(Integer, ForeignKey("forums.id", ondelete="CASCADE"), nullable=False)
@@ -56,6 +68,13 @@ class Post(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_reported = Column(Boolean, default=False)
     report_reason = Column(Text, nullable=True)
+    reported_at = Column(DateTime, nullable=True)
+    deleted_at = Column(DateTime, nullable=True)  # Soft delete: hidden at once, rows purged by forum_tasks
+    
+    # Denormalized counters, maintained by forum_repo (see reconcile_counters)
+    like_count = Column(Integer, default=0, server_default="0", nullable=False)
+    response_count = Column(Integer, default=0, server_default="0", nullable=False)
+    hot_score = Column(Float, default=0.0, server_default="0", nullable=False)  # See core.ranking
     
     # Relationships with cascade delete
     forum = relationship("Forum", back_populates="posts")
@@ -76,6 +95,12 @@ class Post(Base):
 
 class Response(Base):
     __tablename__ = "responses"
+    __table_args__ = (
+        # Keyset pagination: responses of a post, oldest first
+        Index("ix_responses_post_created_id", "post_id", "created_at", "id"),
+        # Moderation queue: only reported rows are indexed
+        Index("ix_responses_reported_queue", "reported_at", "id", sqlite_where=text("is_reported = 1")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
@@ -86,6 +111,10 @@ class Response(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_reported = Column(Boolean, default=False)
     report_reason = Column(Text, nullable=True)
+    reported_at = Column(DateTime, nullable=True)
+    
+    # Denormalized counter, maintained by forum_repo (see reconcile_counters)
+    like_count = Column(Integer, default=0, server_default="0", nullable=False)
     
     # Relationships with cascade delete
     post = relationship("Post", back_populates="responses")
@@ -100,6 +129,10 @@ class Response(Base):
 
 class PostLike(Base):
     __tablename__ = "post_likes"
+    __table_args__ = (
+        # One like per user per post; also serves liked-by-me lookups
+        Index("uq_post_likes_post_user", "post_id", "user_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
@@ -113,6 +146,10 @@ class PostLike(Base):
 
 class ResponseLike(Base):
     __tablename__ = "response_likes"
+    __table_args__ = (
+        # One like per user per response; also serves liked-by-me lookups
+        Index("uq_response_likes_response_user", "response_id", "user_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     response_id = Column(Integer, ForeignKey("responses.id", ondelete="CASCADE"), nullable=False)
@@ -122,3 +159,22 @@ class ResponseLike(Base):
     # Relationships
     response = relationship("Response", back_populates="likes")
     user = relationship("User")
+
+
+class ImportCheckpoint(Base):
+    """Last NDJSON line committed by a bulk import (see services/forum_import.py)"""
+    __tablename__ = "import_checkpoints"
+    
+    import_id = Column(String, primary_key=True)
+    line = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ImportIdMap(Base):
+    """Source id -> local id of every row a bulk import created, so children can be resolved on resume"""
+    __tablename__ = "import_id_map"
+    
+    import_id = Column(String, primary_key=True)
+    kind = Column(String, primary_key=True)  # "forum", "post" or "response"
+    source_id = Column(Integer, primary_key=True)
+    target_id = Column(Integer, nullable=False)
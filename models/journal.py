@@ -1,11 +1,20 @@
 # models/journal.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func, text
 from core.database import Base
+from datetime import datetime
 
 
 class Journal(Base):
     __tablename__ = "journals"
+    __table_args__ = (
+        # Keyset pagination: a user's notes, pinned first, newest first
+        Index("ix_journals_user_pinned_created", "user_id", "is_pinned", "created_at", "id"),
+        # Delta sync: a user's changes (edits and tombstones) in write order
+        Index("ix_journals_user_updated", "user_id", "updated_at", "id"),
+        # Tombstone purge
+        Index("ix_journals_deleted", "deleted_at", sqlite_where=text("deleted_at IS NOT NULL")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -21,4 +30,18 @@ class Journal(Base):
     report = Column(Boolean, default=False)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    # Written from Python with microseconds: delta sync tokens compare it at sub-second precision
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Tombstone: set (and title/content cleared) when the journal is deleted, so
+    # sync clients learn about the deletion; purged after the sync retention
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class JournalHumorDaily(Base):
+    """Number of journals per user, day (of created_at) and humor; maintained by journal_repo"""
+    __tablename__ = "journal_humor_daily"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    humor = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
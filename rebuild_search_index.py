@@ -0,0 +1,36 @@
+# rebuild_search_index.py
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, init_db, engine
+from repo import search_repo
+
+
+def rebuild_search_index():
+    """Rebuild the forum and journal full-text indexes from existing rows"""
+    
+    init_db()
+    search_repo.init_forum_search(engine)
+    search_repo.init_journal_search(engine)
+    db: Session = SessionLocal()
+    
+    try:
+        print("🚀 Rebuilding search indexes...")
+        print("="*50)
+        
+        count = search_repo.rebuild_forum_search(db)
+        print(f"✅ Indexed {count} posts and responses")
+        
+        count = search_repo.rebuild_journal_search(db)
+        print(f"✅ Indexed {count} journals")
+        
+        print("="*50)
+        
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_search_index()
@@ -0,0 +1,64 @@
+# reconcile_counters.py
+import sys
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, init_db
+from repo import forum_repo
+
+
+def reconcile_counters(fix: bool = True):
+    """
+    Remove duplicate and orphaned likes/responses, recompute post/response like
+    and response counters and report any drift
+    """
+    
+    init_db()
+    db: Session = SessionLocal()
+    
+    try:
+        print("🚀 Reconciling forum counters...")
+        print("="*50)
+        
+        if fix:
+            removed = forum_repo.remove_duplicate_likes(db)
+            for label, count in removed.items():
+                if count:
+                    print(f"🧹 Removed {count} duplicate {label}")
+            removed = forum_repo.remove_orphaned_rows(db)
+            for label, count in removed.items():
+                if count:
+                    print(f"🧹 Removed {count} orphaned {label}")
+            # Build unique like indexes that duplicates may have blocked
+            init_db()
+            # Reports made before reported_at existed need a moderation queue position
+            backfilled = forum_repo.backfill_reported_at(db)
+            if backfilled:
+                print(f"🧹 Backfilled reported_at on {backfilled} reported items")
+        
+        drift = forum_repo.reconcile_counters(db, fix=fix)
+        if fix:
+            # Counters feed the hot ranking, so refresh scores from the corrected values
+            forum_repo.redecay_hot_scores(db)
+        
+        for label, count in drift.items():
+            status = "✅" if count == 0 else "⚠️ "
+            print(f"{status} {label}: {count} drifted rows")
+        
+        print("="*50)
+        if not fix:
+            print("ℹ️  Dry run, nothing was written")
+        elif any(drift.values()):
+            print(f"✅ Fixed {sum(drift.values())} counters")
+        else:
+            print("✅ All counters are consistent")
+        
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    # python reconcile_counters.py [--dry-run]
+    reconcile_counters(fix="--dry-run" not in sys.argv)
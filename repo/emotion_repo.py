@@ -0,0 +1,46 @@
+# repo/emotion_repo.py
+import json
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.emotion import EmotionCacheEntry
+from typing import Dict, List
+from datetime import datetime, timedelta
+
+
+def get_cached_emotions(db: Session, keys: List[str]) -> Dict[str, dict]:
+    """Cached emotions of the given keys that exist, by key (one query)"""
+    if not keys:
+        return {}
+    rows = db.execute(
+        select(EmotionCacheEntry.key, EmotionCacheEntry.emotions).where(EmotionCacheEntry.key.in_(set(keys)))
+    )
+    return {key: json.loads(emotions) for key, emotions in rows}
+
+
+def save_cached_emotions(db: Session, model_version: str, results: Dict[str, dict]) -> None:
+    """Store emotions by key (one executemany; keys already present are left alone)"""
+    if not results:
+        return
+    now = datetime.utcnow()
+    db.execute(
+        sqlite_insert(EmotionCacheEntry).on_conflict_do_nothing(index_elements=["key"]),
+        [
+            {"key": key, "model_version": model_version, "emotions": json.dumps(emotions), "created_at": now}
+            for key, emotions in results.items()
+        ]
+    )
+    db.commit()
+
+
+def purge_cached_emotions(db: Session, model_version: str, max_age_days: int) -> int:
+    """Delete entries of other model versions or older than max_age_days. Returns the number deleted"""
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    purged = db.execute(
+        delete(EmotionCacheEntry).where(or_(
+            EmotionCacheEntry.model_version != model_version,
+            EmotionCacheEntry.created_at < cutoff
+        ))
+    ).rowcount
+    db.commit()
+    return purged
@@ -1,14 +1,152 @@
 # repo/forum_repo.py
+import os
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete, func, literal, null, select, text, tuple_, union_all, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from models.forum import Forum, ForumModerator, Post, Response, PostLike, ResponseLike
-from typing import List, Optional
+from models.user import User
+from core.pagination import next_cursor, encode_cursor, encode_rank_cursor
+from core import ranking
+from core.broker import broker
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+
+
+Cursor = Optional[Tuple[datetime, int]]
+FeedRow = Tuple[Post, Optional[User], int, int]
+
+# POST_DELETE_MODE=soft hides deleted posts at once and leaves removing their
+# rows to the background purger (services/forum_tasks.py)
+SOFT_DELETE_POSTS = os.getenv("POST_DELETE_MODE", "hard") == "soft"
+
+
+def _keyset_page(query, model, after: Cursor, limit: int, descending: bool = True, key=lambda row: row):
+    """
+    Apply (created_at, id) keyset pagination to a query.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    position = tuple_(model.created_at, model.id)
+    if after is not None:
+        query = query.filter(position < after if descending else position > after)
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+    return next_cursor(query.limit(limit + 1).all(), limit, key)
+
+
+# =====================================================
+# CONTENT VERSIONS (HTTP validators)
+# =====================================================
+# forums.content_version is bumped by triggers on every write that can change
+# a forum's directory entry, feed or threads, so GET endpoints can derive an
+# ETag from one indexed lookup instead of rebuilding the payload. UPDATE
+# triggers only watch the columns that are served: hot_score re-decay and
+# report flags leave versions alone. The hot feed's order also moves with
+# decay, so its ETag adds the decay epoch (see api/forum.py).
+
+# (table, id of the forum a row belongs to, columns whose updates count; None = all)
+_VERSIONED_TABLES = (
+    ("posts", "{row}.forum_id", "title, content, is_anonymous, like_count, response_count, deleted_at"),
+    ("forum_moderators", "{row}.forum_id", None),
+    ("responses", "(SELECT forum_id FROM posts WHERE id = {row}.post_id)", "content, is_anonymous, like_count"),
+)
+
+_FORUM_VERSION_TRIGGERS = [
+    (f"{table}_version_{event.lower()}", f"{event} OF {columns}" if event == "UPDATE" and columns else event, table,
+     f"id = {forum_id.format(row=row)}")
+    for table, forum_id, columns in _VERSIONED_TABLES
+    for event, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old"))
+] + [
+    # Feeds and threads embed author names, which are derived from the email
+    ("users_version_update", "UPDATE OF email", "users",
+     "id IN (SELECT forum_id FROM posts WHERE author_id = new.id"
+     " UNION SELECT posts.forum_id FROM responses JOIN posts ON posts.id = responses.post_id"
+     " WHERE responses.author_id = new.id)"),
+]
+
+FORUM_VERSION_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table} BEGIN
+        UPDATE forums SET content_version = content_version + 1 WHERE {condition};
+    END
+    """
+    for name, event, table, condition in _FORUM_VERSION_TRIGGERS
+]
+
+
+def init_forum_versions(engine: Engine) -> None:
+    """(Re)create the triggers maintaining forums.content_version (idempotent)"""
+    with engine.begin() as conn:
+        for (name, *_), ddl in zip(_FORUM_VERSION_TRIGGERS, FORUM_VERSION_DDL):
+            # Dropped first so databases keep up with changes to the definitions
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(ddl))
+
+
+def get_directory_version(db: Session) -> Tuple[int, int]:
+    """(number of active forums, sum of their content versions) for the forum directory"""
+    count, version = db.query(func.count(Forum.id), func.total(Forum.content_version)).filter(
+        Forum.is_active == True
+    ).one()
+    return count, int(version)
+
+
+def get_forum_version(db: Session, forum_id: int) -> Optional[int]:
+    """Content version of a forum, None if it does not exist"""
+    return db.query(Forum.content_version).filter(Forum.id == forum_id).scalar()
+
+
+def get_post_forum_version(db: Session, post_id: int) -> Optional[int]:
+    """Content version of the forum a post belongs to, None if the post does not exist"""
+    return (
+        db.query(Forum.content_version)
+        .join(Post, Post.forum_id == Forum.id)
+        .filter(Post.id == post_id, Post.deleted_at.is_(None))
+        .scalar()
+    )
 
 
 # =====================================================
 # FORUM OPERATIONS
 # =====================================================
 
+def _forum_directory_query(db: Session):
+    """Forums joined with their moderator and post counts (grouped subqueries)"""
+    moderator_counts = (
+        db.query(ForumModerator.forum_id, func.count(ForumModerator.id).label("moderator_count"))
+        .group_by(ForumModerator.forum_id)
+        .subquery()
+    )
+    post_counts = (
+        db.query(Post.forum_id, func.count(Post.id).label("post_count"))
+        .filter(Post.deleted_at.is_(None))
+        .group_by(Post.forum_id)
+        .subquery()
+    )
+    return (
+        db.query(
+            Forum,
+            func.coalesce(moderator_counts.c.moderator_count, 0),
+            func.coalesce(post_counts.c.post_count, 0)
+        )
+        .outerjoin(moderator_counts, moderator_counts.c.forum_id == Forum.id)
+        .outerjoin(post_counts, post_counts.c.forum_id == Forum.id)
+        .filter(Forum.is_active == True)
+    )
+
+
+def get_forum_directory(db: Session, skip: int = 0, limit: int = 100) -> List[Tuple[Forum, int, int]]:
+    """Get active forums as (forum, moderator_count, post_count) rows in one query"""
+    return _forum_directory_query(db).order_by(Forum.id).offset(skip).limit(limit).all()
+
+
+def get_forum_directory_entry(db: Session, forum_id: int) -> Optional[Tuple[Forum, int, int]]:
+    """Get a single (forum, moderator_count, post_count) row in one query"""
+    return _forum_directory_query(db).filter(Forum.id == forum_id).first()
+
+
 def get_all_forums(db: Session, skip: int = 0, limit: int = 100) -> List[Forum]:
     """Get all active forums"""
     return db.query(Forum).filter(Forum.is_active == True).offset(skip).limit(limit).all()
@@ -50,7 +188,7 @@ def get_moderator_count(db: Session, forum_id: int) -> int:
 
 def get_post_count_for_forum(db: Session, forum_id: int) -> int:
     """Get count of posts in a forum"""
-    return db.query(Post).filter(Post.forum_id == forum_id).count()
+    return db.query(Post).filter(Post.forum_id == forum_id, Post.deleted_at.is_(None)).count()
 
 
 # =====================================================
@@ -64,32 +202,34 @@ def create_post(db: Session, forum_id: int, author_id: int, title: str, content:
         author_id=author_id,
         title=title,
         content=content,
-        is_anonymous=is_anonymous
+        is_anonymous=is_anonymous,
+        hot_score=ranking.hot_score(0, 0, None)
     )
     db.add(post)
     db.commit()
     db.refresh(post)
+    broker.publish({"type": "post_created", "forum_id": post.forum_id, "post_id": post.id})
     return post
 
 
 def get_post_by_id(db: Session, post_id: int) -> Optional[Post]:
-    """Get a single post by ID"""
-    return db.query(Post).filter(Post.id == post_id).first()
+    """Get a single post by ID (soft-deleted posts are hidden)"""
+    return db.query(Post).filter(Post.id == post_id, Post.deleted_at.is_(None)).first()
 
 
-def get_posts_by_forum(db: Session, forum_id: int, skip: int = 0, limit: int = 50) -> List[Post]:
-    """Get all posts for a specific forum"""
-    return db.query(Post).filter(Post.forum_id == forum_id).order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+def get_posts_by_forum(db: Session, forum_id: int, after: Cursor = None, limit: int = 50) -> Tuple[List[Post], Optional[str]]:
+    """Get posts for a specific forum, newest first, starting after a keyset cursor"""
+    return _keyset_page(db.query(Post).filter(Post.forum_id == forum_id, Post.deleted_at.is_(None)), Post, after, limit)
 
 
-def get_posts_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 50) -> List[Post]:
-    """Get all posts by a specific user"""
-    return db.query(Post).filter(Post.author_id == user_id).order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+def get_posts_by_user(db: Session, user_id: int, after: Cursor = None, limit: int = 50) -> Tuple[List[Post], Optional[str]]:
+    """Get posts by a specific user, newest first, starting after a keyset cursor"""
+    return _keyset_page(db.query(Post).filter(Post.author_id == user_id, Post.deleted_at.is_(None)), Post, after, limit)
 
 
 def update_post(db: Session, post_id: int, title: Optional[str] = None, content: Optional[str] = None) -> Optional[Post]:
     """Update a post"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = get_post_by_id(db, post_id)
     if not post:
         return None
     
@@ -103,45 +243,140 @@ def update_post(db: Session, post_id: int, title: Optional[str] = None, content:
     return post
 
 
-def delete_post(db: Session, post_id: int) -> bool:
-    """Delete a post"""
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if post:
-        db.delete(post)
+def _delete_posts(db: Session, post_ids: List[int], soft: bool) -> int:
+    """
+    Soft-delete (stamp deleted_at) or hard-delete posts inside the caller's
+    transaction. A hard delete is one statement: the foreign keys cascade to
+    responses and likes in the database, nothing is loaded into the session.
+    """
+    if not post_ids:
+        return 0
+    if soft:
+        return db.execute(
+            update(Post)
+            .where(Post.id.in_(post_ids), Post.deleted_at.is_(None))
+            .values({Post.deleted_at: datetime.utcnow(), Post.updated_at: Post.updated_at})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    return db.execute(
+        delete(Post).where(Post.id.in_(post_ids)).execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def delete_post(db: Session, post_id: int, soft: Optional[bool] = None) -> bool:
+    """Delete a post, softly when soft (default: POST_DELETE_MODE)"""
+    deleted = _delete_posts(db, [post_id], SOFT_DELETE_POSTS if soft is None else soft)
+    db.commit()
+    return deleted > 0
+
+
+def purge_deleted_posts(db: Session, batch_size: int = 500) -> int:
+    """
+    Remove the rows of soft-deleted posts in small transactions, so a popular
+    post never holds the write lock for long: its responses (response likes
+    cascade) and likes batch_size rows at a time, then the posts themselves.
+    Returns the number of posts purged.
+    """
+    deleted_posts = select(Post.id).where(Post.deleted_at.is_not(None))
+    for model, post_column in ((Response, Response.post_id), (PostLike, PostLike.post_id)):
+        while True:
+            batch = select(model.id).where(post_column.in_(deleted_posts)).limit(batch_size)
+            removed = db.execute(
+                delete(model).where(model.id.in_(batch)).execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if removed < batch_size:
+                break
+    purged = 0
+    while True:
+        removed = db.execute(
+            delete(Post).where(Post.id.in_(deleted_posts.limit(batch_size))).execution_options(synchronize_session=False)
+        ).rowcount
         db.commit()
-        return True
-    return False
+        purged += removed
+        if removed < batch_size:
+            return purged
 
 
 def report_post(db: Session, post_id: int, reason: str) -> Optional[Post]:
     """Report a post"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = get_post_by_id(db, post_id)
     if not post:
         return None
     
     post.is_reported = True
     post.report_reason = reason
+    post.reported_at = datetime.utcnow()
     db.commit()
     db.refresh(post)
     return post
 
 
+def _post_feed_query(db: Session):
+    """Posts joined with their author and denormalized like/response counters"""
+    return (
+        db.query(Post, User, Post.like_count, Post.response_count)
+        .outerjoin(User, User.id == Post.author_id)
+        .filter(Post.deleted_at.is_(None))
+    )
+
+
+def get_post_feed(db: Session, forum_id: int, after: Cursor = None, limit: int = 50) -> Tuple[List[FeedRow], Optional[str]]:
+    """Get a page of (post, author, like_count, response_count) rows for a forum in one query"""
+    return _keyset_page(
+        _post_feed_query(db).filter(Post.forum_id == forum_id), Post, after, limit, key=lambda row: row[0]
+    )
+
+
+def get_hot_post_feed(db: Session, forum_id: int, after: Optional[Tuple[float, int]] = None, limit: int = 50) -> Tuple[List[FeedRow], Optional[str]]:
+    """
+    Get a page of feed rows for a forum ordered by stored hot_score, highest first.
+    Pages continue after a (hot_score, id) rank cursor.
+    """
+    query = _post_feed_query(db).filter(Post.forum_id == forum_id)
+    if after is not None:
+        query = query.filter(tuple_(Post.hot_score, Post.id) < after)
+    rows = query.order_by(Post.hot_score.desc(), Post.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1][0]
+    return rows, encode_rank_cursor(last.hot_score, last.id)
+
+
+def get_user_post_feed(db: Session, user_id: int, after: Cursor = None, limit: int = 50, include_anonymous: bool = False) -> Tuple[List[FeedRow], Optional[str]]:
+    """Get a page of (post, author, like_count, response_count) rows for a user's posts in one query"""
+    query = _post_feed_query(db).filter(Post.author_id == user_id)
+    if not include_anonymous:
+        query = query.filter(Post.is_anonymous == False)
+    return _keyset_page(query, Post, after, limit, key=lambda row: row[0])
+
+
+def get_post_feed_entry(db: Session, post_id: int) -> Optional[FeedRow]:
+    """Get a single (post, author, like_count, response_count) row in one query"""
+    return _post_feed_query(db).filter(Post.id == post_id).first()
+
+
 def get_post_like_count(db: Session, post_id: int) -> int:
     """Get like count for a post"""
-    return db.query(func.count(PostLike.id)).filter(PostLike.post_id == post_id).scalar() or 0
+    return db.query(Post.like_count).filter(Post.id == post_id).scalar() or 0
 
 
 def get_response_count_for_post(db: Session, post_id: int) -> int:
     """Get count of responses for a post"""
-    return db.query(func.count(Response.id)).filter(Response.post_id == post_id).scalar() or 0
+    return db.query(Post.response_count).filter(Post.id == post_id).scalar() or 0
 
 
 # =====================================================
 # RESPONSE OPERATIONS
 # =====================================================
 
-def create_response(db: Session, post_id: int, author_id: int, content: str, is_anonymous: bool) -> Response:
-    """Create a new response"""
+def create_response(db: Session, post_id: int, author_id: int, content: str, is_anonymous: bool) -> Optional[Response]:
+    """Create a new response. Returns None if the post does not exist (or is deleted)"""
+    counters = _bump_counter(db, Post, post_id, Post.response_count, 1, Post.forum_id)
+    if counters is None:
+        db.rollback()
+        return None
     response = Response(
         post_id=post_id,
         author_id=author_id,
@@ -151,17 +386,49 @@ def create_response(db: Session, post_id: int, author_id: int, content: str, is_
     db.add(response)
     db.commit()
     db.refresh(response)
+    response_count, forum_id = counters
+    broker.publish({
+        "type": "response_created",
+        "forum_id": forum_id,
+        "post_id": post_id,
+        "response_id": response.id,
+        "response_count": response_count
+    })
     return response
 
 
 def get_response_by_id(db: Session, response_id: int) -> Optional[Response]:
-    """Get a single response by ID"""
-    return db.query(Response).filter(Response.id == response_id).first()
+    """Get a single response by ID (hidden with a soft-deleted post)"""
+    return (
+        db.query(Response)
+        .join(Post, Post.id == Response.post_id)
+        .filter(Response.id == response_id, Post.deleted_at.is_(None))
+        .first()
+    )
+
 
+def get_responses_by_post(db: Session, post_id: int, after: Cursor = None, limit: int = 100) -> Tuple[List[Response], Optional[str]]:
+    """Get responses for a specific post, oldest first, starting after a keyset cursor"""
+    visible_post = select(Post.id).where(Post.id == post_id, Post.deleted_at.is_(None))
+    return _keyset_page(
+        db.query(Response).filter(Response.post_id == post_id, visible_post.exists()), Response, after, limit, descending=False
+    )
 
-def get_responses_by_post(db: Session, post_id: int, skip: int = 0, limit: int = 100) -> List[Response]:
-    """Get all responses for a specific post"""
-    return db.query(Response).filter(Response.post_id == post_id).order_by(Response.created_at.asc()).offset(skip).limit(limit).all()
+
+def get_thread_responses_page(db: Session, post_id: int, after: Cursor = None, limit: int = 200) -> List[Tuple[Response, Optional[User]]]:
+    """
+    Up to limit (response, author) rows of a post, oldest first, after a
+    (created_at, id) keyset position, in one query. Thread streaming reads one
+    page at a time so no read cursor stays open while the body is sent.
+    """
+    query = (
+        db.query(Response, User)
+        .outerjoin(User, User.id == Response.author_id)
+        .filter(Response.post_id == post_id)
+    )
+    if after is not None:
+        query = query.filter(tuple_(Response.created_at, Response.id) > after)
+    return query.order_by(Response.created_at.asc(), Response.id.asc()).limit(limit).all()
 
 
 def update_response(db: Session, response_id: int, content: str) -> Optional[Response]:
@@ -177,23 +444,26 @@ def update_response(db: Session, response_id: int, content: str) -> Optional[Res
 
 
 def delete_response(db: Session, response_id: int) -> bool:
-    """Delete a response"""
-    response = db.query(Response).filter(Response.id == response_id).first()
-    if response:
-        db.delete(response)
-        db.commit()
-        return True
-    return False
+    """Delete a response (its likes go with it through the foreign key cascade)"""
+    post_id = db.execute(
+        delete(Response).where(Response.id == response_id).returning(Response.post_id)
+    ).scalar()
+    if post_id is None:
+        return False
+    _bump_counter(db, Post, post_id, Post.response_count, -1)
+    db.commit()
+    return True
 
 
 def report_response(db: Session, response_id: int, reason: str) -> Optional[Response]:
     """Report a response"""
-    response = db.query(Response).filter(Response.id == response_id).first()
+    response = get_response_by_id(db, response_id)
     if not response:
         return None
     
     response.is_reported = True
     response.report_reason = reason
+    response.reported_at = datetime.utcnow()
     db.commit()
     db.refresh(response)
     return response
@@ -201,44 +471,382 @@ def report_response(db: Session, response_id: int, reason: str) -> Optional[Resp
 
 def get_response_like_count(db: Session, response_id: int) -> int:
     """Get like count for a response"""
-    return db.query(func.count(ResponseLike.id)).filter(ResponseLike.response_id == response_id).scalar() or 0
+    return db.query(Response.like_count).filter(Response.id == response_id).scalar() or 0
 
 
 # =====================================================
-# LIKE OPERATIONS
+# MODERATION
 # =====================================================
+# Queue items are keyed like search rows: item_key = id * 2 for posts and
+# id * 2 + 1 for responses, so one (reported_at, item_key) cursor orders both.
+
+def _moderated_forum_ids(moderator_id: int, forum_id: Optional[int] = None):
+    """Subquery of the forums a user moderates (optionally just one of them)"""
+    forums = select(ForumModerator.forum_id).where(ForumModerator.user_id == moderator_id)
+    if forum_id is not None:
+        forums = forums.where(ForumModerator.forum_id == forum_id)
+    return forums
+
+
+def is_moderator(db: Session, moderator_id: int, forum_id: Optional[int] = None) -> bool:
+    """Whether the user moderates the given forum (or any forum)"""
+    return db.execute(select(_moderated_forum_ids(moderator_id, forum_id).exists())).scalar()
+
+
+def get_moderation_queue(db: Session, moderator_id: int, forum_id: Optional[int] = None, after: Cursor = None, limit: int = 50) -> Tuple[List[dict], Optional[str]]:
+    """
+    Reported posts and responses in the moderator's forums, oldest report first.
+    Each side is a bounded range scan of its partial index on reported rows;
+    only the two page-sized heads are merged.
+    """
+    forums = _moderated_forum_ids(moderator_id, forum_id)
+
+    def page_of(query, model, parity):
+        if after is not None:
+            # item_key > k  <=>  id > (k - parity) // 2, which the index can seek on
+            reported_at, item_key = after
+            query = query.where(tuple_(model.reported_at, model.id) > (reported_at, (item_key - parity) // 2))
+        return query.order_by(model.reported_at, model.id).limit(limit + 1).subquery().select()
+
+    reported_posts = page_of(
+        select(
+            literal("post").label("kind"),
+            Post.id.label("id"),
+            Post.id.label("post_id"),
+            Post.forum_id.label("forum_id"),
+            Post.title.label("title"),
+            Post.content.label("content"),
+            Post.author_id.label("author_id"),
+            Post.report_reason.label("report_reason"),
+            Post.reported_at.label("reported_at"),
+            (Post.id * 2).label("item_key"),
+        )
+        .where(Post.is_reported == True, Post.deleted_at.is_(None), Post.forum_id.in_(forums)),
+        Post, 0
+    )
+    # Forum looked up per reported response rather than joined, so the scan
+    # starts from the reported responses instead of every post of the forums
+    response_forum = select(Post.forum_id).where(Post.id == Response.post_id, Post.deleted_at.is_(None)).scalar_subquery()
+    reported_responses = page_of(
+        select(
+            literal("response"),
+            Response.id,
+            Response.post_id,
+            response_forum,
+            null(),
+            Response.content,
+            Response.author_id,
+            Response.report_reason,
+            Response.reported_at,
+            Response.id * 2 + 1,
+        )
+        .where(Response.is_reported == True, response_forum.in_(forums)),
+        Response, 1
+    )
+    queue = union_all(reported_posts, reported_responses).subquery()
+    query = select(queue).order_by(queue.c.reported_at, queue.c.item_key).limit(limit + 1)
+
+    rows = [dict(row) for row in db.execute(query).mappings()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]["reported_at"], rows[-1]["item_key"])
+
+
+def _allowed_items(db: Session, moderator_id: int, post_ids: List[int], response_ids: List[int]) -> Tuple[List[int], List[Tuple[int, int]]]:
+    """Filter requested ids down to items in the moderator's forums: (post ids, (response id, post id))"""
+    forums = _moderated_forum_ids(moderator_id)
+    allowed_posts = []
+    allowed_responses = []
+    if post_ids:
+        allowed_posts = db.execute(
+            select(Post.id).where(Post.id.in_(post_ids), Post.deleted_at.is_(None), Post.forum_id.in_(forums))
+        ).scalars().all()
+    if response_ids:
+        allowed_responses = db.execute(
+            select(Response.id, Response.post_id)
+            .join(Post, Post.id == Response.post_id)
+            .where(Response.id.in_(response_ids), Post.deleted_at.is_(None), Post.forum_id.in_(forums))
+        ).all()
+    return allowed_posts, [tuple(row) for row in allowed_responses]
+
+
+def bulk_dismiss_reports(db: Session, moderator_id: int, post_ids: List[int], response_ids: List[int]) -> dict:
+    """Clear the report on many posts/responses of the moderator's forums in one transaction"""
+    forums = _moderated_forum_ids(moderator_id)
+    cleared = {"is_reported": False, "report_reason": None, "reported_at": None}
+    posts = db.execute(
+        update(Post)
+        .where(Post.id.in_(post_ids), Post.forum_id.in_(forums))
+        .values(cleared)
+        .execution_options(synchronize_session=False)
+    ).rowcount if post_ids else 0
+    responses = db.execute(
+        update(Response)
+        .where(
+            Response.id.in_(response_ids),
+            Response.post_id.in_(select(Post.id).where(Post.forum_id.in_(forums)))
+        )
+        .values(cleared)
+        .execution_options(synchronize_session=False)
+    ).rowcount if response_ids else 0
+    db.commit()
+    return {"posts": posts, "responses": responses}
+
+
+def bulk_delete_content(db: Session, moderator_id: int, post_ids: List[int], response_ids: List[int], soft: Optional[bool] = None) -> dict:
+    """
+    Delete many posts/responses of the moderator's forums in one transaction with
+    set-based statements (children and likes cascade), then fix response counters
+    and hot scores.
+    Posts are soft-deleted when soft (default: POST_DELETE_MODE).
+    """
+    post_ids, responses = _allowed_items(db, moderator_id, post_ids, response_ids)
+    response_ids = [response_id for response_id, _ in responses]
+    touched_posts = {post_id for _, post_id in responses} - set(post_ids)
+
+    if response_ids:
+        db.execute(delete(Response).where(Response.id.in_(response_ids)).execution_options(synchronize_session=False))
+    _delete_posts(db, post_ids, SOFT_DELETE_POSTS if soft is None else soft)
+
+    if touched_posts:
+        response_count = select(func.count(Response.id)).where(Response.post_id == Post.id).correlate(Post).scalar_subquery()
+        db.execute(
+            update(Post)
+            .where(Post.id.in_(touched_posts))
+            .values({
+                Post.response_count: response_count,
+                # SET expressions see the old row, so feed the recounted value explicitly
+                Post.hot_score: func.hot_score(Post.like_count, response_count, Post.created_at),
+                Post.updated_at: Post.updated_at
+            })
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return {"posts": len(post_ids), "responses": len(response_ids)}
+
+
+def backfill_reported_at(db: Session) -> int:
+    """Give reports made before reported_at existed a queue position (their last update)"""
+    updated = 0
+    for model in (Post, Response):
+        updated += db.execute(
+            update(model)
+            .where(model.is_reported == True, model.reported_at.is_(None))
+            .values({model.reported_at: func.coalesce(model.updated_at, model.created_at), model.updated_at: model.updated_at})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    db.commit()
+    return updated
 
-def toggle_post_like(db: Session, post_id: int, user_id: int) -> bool:
-    """Toggle like on a post. Returns True if liked, False if unliked"""
-    existing_like = db.query(PostLike).filter(
-        PostLike.post_id == post_id,
-        PostLike.user_id == user_id
+
+# =====================================================
+# COUNTERS
+# =====================================================
+
+def _bump_counter(db: Session, model, row_id: int, column, delta: int, *returning):
+    """
+    Adjust a denormalized counter inside the caller's transaction.
+    Returns a row of (new counter value, *returning), or None if the row is gone
+    (or is a soft-deleted post). updated_at is pinned so likes and replies do not
+    count as edits; a post's hot_score is refreshed in the same statement.
+    """
+    values = {column: column + delta, model.updated_at: model.updated_at}
+    conditions = [model.id == row_id]
+    if model is Post:
+        conditions.append(Post.deleted_at.is_(None))
+        # SET expressions see the old row, so feed the new counter value explicitly
+        like_count = Post.like_count + delta if column is Post.like_count else Post.like_count
+        response_count = Post.response_count + delta if column is Post.response_count else Post.response_count
+        values[Post.hot_score] = func.hot_score(like_count, response_count, Post.created_at)
+    return db.execute(
+        update(model)
+        .where(*conditions)
+        .values(values)
+        .returning(column, *returning)
+        .execution_options(synchronize_session=False)
     ).first()
-    
-    if existing_like:
-        db.delete(existing_like)
+
+
+def _counter_sources():
+    """(label, model, counter column, correlated COUNT(*) of the source rows)"""
+    return [
+        ("posts.like_count", Post, Post.like_count,
+         select(func.count(PostLike.id)).where(PostLike.post_id == Post.id).correlate(Post).scalar_subquery()),
+        ("posts.response_count", Post, Post.response_count,
+         select(func.count(Response.id)).where(Response.post_id == Post.id).correlate(Post).scalar_subquery()),
+        ("responses.like_count", Response, Response.like_count,
+         select(func.count(ResponseLike.id)).where(ResponseLike.response_id == Response.id).correlate(Response).scalar_subquery()),
+    ]
+
+
+def reconcile_counters(db: Session, fix: bool = True) -> dict:
+    """
+    Recompute every denormalized counter in bulk.
+    Returns the number of drifted rows per counter; rewrites them when fix is True.
+    """
+    drift = {}
+    for label, model, column, actual in _counter_sources():
+        drifted = column != actual
+        drift[label] = db.query(func.count(model.id)).filter(drifted).scalar()
+        if fix and drift[label]:
+            db.query(model).filter(drifted).update(
+                {column: actual, model.updated_at: model.updated_at},
+                synchronize_session=False
+            )
+    if fix:
         db.commit()
-        return False  # Unlike
+    return drift
+
+
+def redecay_hot_scores(db: Session) -> int:
+    """
+    Recompute hot_score for posts inside the hot window, plus older posts still
+    carrying a score (which drop to 0). Returns the number of posts updated.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=ranking.HOT_WINDOW_DAYS)
+    updated = db.execute(
+        update(Post)
+        .where((Post.created_at >= cutoff) | (Post.hot_score > 0))
+        .values({
+            Post.hot_score: func.hot_score(Post.like_count, Post.response_count, Post.created_at),
+            Post.updated_at: Post.updated_at
+        })
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return updated
+
+
+# =====================================================
+# LIKE OPERATIONS
+# =====================================================
+
+def _toggle_like(db: Session, like_model, target_column, target_id: int, user_id: int, counter_model, counter_column, *returning):
+    """
+    Toggle a like without a read-before-write: try to delete the like, and if
+    nothing was deleted insert it, ignoring a concurrent duplicate through the
+    unique (target, user) index. The counter moves only when a row actually changed.
+    Returns (liked, row of (new like count, *returning)), or None when the target
+    is gone (e.g. a post soft-deleted meanwhile); the like change is then rolled back.
+    """
+    deleted = db.execute(
+        delete(like_model).where(target_column == target_id, like_model.user_id == user_id)
+    ).rowcount
+
+    if deleted:
+        liked, delta = False, -deleted
     else:
-        like = PostLike(post_id=post_id, user_id=user_id)
-        db.add(like)
-        db.commit()
-        return True  # Like
+        inserted = db.execute(
+            sqlite_insert(like_model)
+            .values({target_column.key: target_id, "user_id": user_id})
+            .on_conflict_do_nothing(index_elements=[target_column.key, "user_id"])
+        ).rowcount
+        liked, delta = True, inserted
+
+    counters = _bump_counter(db, counter_model, target_id, counter_column, delta, *returning)
+    if counters is None:
+        db.rollback()
+        return None
+    db.commit()
+    return liked, counters
+
+
+def toggle_post_like(db: Session, post_id: int, user_id: int) -> Optional[Tuple[bool, int]]:
+    """Toggle like on a post. Returns (liked, new like count), None if the post is gone"""
+    toggled = _toggle_like(
+        db, PostLike, PostLike.post_id, post_id, user_id, Post, Post.like_count, Post.forum_id
+    )
+    if toggled is None:
+        return None
 
+    liked, (like_count, forum_id) = toggled
+    broker.publish({
+        "type": "post_like",
+        "key": f"post_like:{post_id}",  # Only the latest count matters to subscribers
+        "forum_id": forum_id,
+        "post_id": post_id,
+        "like_count": like_count
+    })
+    return liked, like_count
+
+
+def toggle_response_like(db: Session, response_id: int, user_id: int) -> Optional[Tuple[bool, int]]:
+    """Toggle like on a response. Returns (liked, new like count), None if the response is gone"""
+    forum_id = select(Post.forum_id).where(Post.id == Response.post_id).scalar_subquery()
+    toggled = _toggle_like(
+        db, ResponseLike, ResponseLike.response_id, response_id, user_id,
+        Response, Response.like_count, Response.post_id, forum_id
+    )
+    if toggled is None:
+        return None
 
-def toggle_response_like(db: Session, response_id: int, user_id: int) -> bool:
-    """Toggle like on a response. Returns True if liked, False if unliked"""
-    existing_like = db.query(ResponseLike).filter(
-        ResponseLike.response_id == response_id,
+    liked, (like_count, post_id, forum_id) = toggled
+    broker.publish({
+        "type": "response_like",
+        "key": f"response_like:{response_id}",  # Only the latest count matters to subscribers
+        "forum_id": forum_id,
+        "post_id": post_id,
+        "response_id": response_id,
+        "like_count": like_count
+    })
+    return liked, like_count
+
+
+def get_liked_post_ids(db: Session, user_id: int, post_ids: List[int]) -> List[int]:
+    """Get which of the given posts the user has liked (one indexed query)"""
+    if not post_ids:
+        return []
+    rows = db.query(PostLike.post_id).filter(
+        PostLike.post_id.in_(post_ids),
+        PostLike.user_id == user_id
+    ).all()
+    return [post_id for post_id, in rows]
+
+
+def get_liked_response_ids(db: Session, user_id: int, response_ids: List[int]) -> List[int]:
+    """Get which of the given responses the user has liked (one indexed query)"""
+    if not response_ids:
+        return []
+    rows = db.query(ResponseLike.response_id).filter(
+        ResponseLike.response_id.in_(response_ids),
         ResponseLike.user_id == user_id
-    ).first()
-    
-    if existing_like:
-        db.delete(existing_like)
-        db.commit()
-        return False  # Unlike
-    else:
-        like = ResponseLike(response_id=response_id, user_id=user_id)
-        db.add(like)
-        db.commit()
-        return True  # Like
\ No newline at end of file
+    ).all()
+    return [response_id for response_id, in rows]
+
+
+def remove_duplicate_likes(db: Session) -> dict:
+    """
+    Delete duplicate (target, user) like rows, keeping the oldest one, so the
+    unique like indexes can be built on databases created before they existed.
+    """
+    removed = {}
+    for label, like_model, target_column in (
+        ("post_likes", PostLike, PostLike.post_id),
+        ("response_likes", ResponseLike, ResponseLike.response_id),
+    ):
+        keep = select(func.min(like_model.id)).group_by(target_column, like_model.user_id)
+        removed[label] = db.execute(
+            delete(like_model).where(like_model.id.not_in(keep))
+        ).rowcount
+    db.commit()
+    return removed
+
+
+def remove_orphaned_rows(db: Session) -> dict:
+    """
+    Delete responses and likes whose post or response no longer exists: left
+    behind by deletes made before foreign keys were enforced, when SQLite
+    ignored ON DELETE CASCADE.
+    """
+    removed = {}
+    for label, model, parent_column, parent_model in (
+        ("responses", Response, Response.post_id, Post),
+        ("post_likes", PostLike, PostLike.post_id, Post),
+        ("response_likes", ResponseLike, ResponseLike.response_id, Response),
+    ):
+        removed[label] = db.execute(
+            delete(model).where(parent_column.not_in(select(parent_model.id)))
+        ).rowcount
+    db.commit()
+    return removed
@@ -0,0 +1,151 @@
+# repo/import_repo.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.forum import Forum, Post, Response, PostLike, ResponseLike, ImportCheckpoint, ImportIdMap
+from models.user import User
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+from datetime import datetime
+
+
+# SQLite accepts at most 32766 bound variables per statement; IN lists built
+# from a whole batch (batch_size goes up to 50000) are split into chunks
+MAX_IN_VALUES = 30000
+
+
+def _chunks(values: List, size: int = MAX_IN_VALUES) -> Iterator[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+# =====================================================
+# CHECKPOINTS AND ID MAP
+# =====================================================
+# Written in the same transaction as the rows of each batch, so a resumed
+# import sees exactly the lines and ids that were committed.
+
+def get_checkpoint(db: Session, import_id: str) -> int:
+    """Last committed line of an import, 0 if it never committed anything"""
+    line = db.execute(select(ImportCheckpoint.line).where(ImportCheckpoint.import_id == import_id)).scalar()
+    return line or 0
+
+
+def save_checkpoint(db: Session, import_id: str, line: int) -> None:
+    """Record the last line of the current batch (committed with the batch)"""
+    db.execute(
+        sqlite_insert(ImportCheckpoint)
+        .values(import_id=import_id, line=line, updated_at=datetime.utcnow())
+        .on_conflict_do_update(
+            index_elements=["import_id"],
+            set_={"line": line, "updated_at": datetime.utcnow()}
+        )
+    )
+
+
+def load_id_map(db: Session, import_id: str) -> Dict[str, Dict[int, int]]:
+    """All source -> local ids recorded by an import, per kind"""
+    id_map: Dict[str, Dict[int, int]] = {}
+    rows = db.execute(
+        select(ImportIdMap.kind, ImportIdMap.source_id, ImportIdMap.target_id)
+        .where(ImportIdMap.import_id == import_id)
+    )
+    for kind, source_id, target_id in rows:
+        id_map.setdefault(kind, {})[source_id] = target_id
+    return id_map
+
+
+def save_id_map(db: Session, import_id: str, kind: str, pairs: List[Tuple[int, int]]) -> None:
+    """Record (source id, local id) pairs of one kind"""
+    if pairs:
+        db.execute(
+            insert(ImportIdMap),
+            [
+                {"import_id": import_id, "kind": kind, "source_id": source_id, "target_id": target_id}
+                for source_id, target_id in pairs
+            ]
+        )
+
+
+# =====================================================
+# BATCHED INSERTS
+# =====================================================
+
+def get_existing_user_ids(db: Session, user_ids: Iterable[int]) -> Set[int]:
+    """Subset of the given user ids that exist"""
+    existing = set()
+    for chunk in _chunks(list(set(user_ids))):
+        existing.update(db.execute(select(User.id).where(User.id.in_(chunk))).scalars())
+    return existing
+
+
+def get_forum_ids_by_name(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """Ids of the existing forums among the given names"""
+    forum_ids = {}
+    for chunk in _chunks(list(set(names))):
+        forum_ids.update(db.execute(select(Forum.name, Forum.id).where(Forum.name.in_(chunk))).all())
+    return forum_ids
+
+
+def insert_returning_ids(db: Session, model, rows: List[dict]) -> List[int]:
+    """executemany INSERT of rows, returning the new ids in the order of rows"""
+    if not rows:
+        return []
+    return list(db.execute(
+        insert(model).returning(model.id, sort_by_parameter_order=True),
+        rows
+    ).scalars())
+
+
+def insert_rows(db: Session, model, rows: List[dict]) -> None:
+    """executemany INSERT of rows whose ids are not needed"""
+    if rows:
+        db.execute(insert(model), rows)
+
+
+def insert_ignoring_duplicates(db: Session, model, conflict_columns: List[str], rows: List[dict]) -> int:
+    """executemany INSERT that skips rows hitting a unique index; returns the number inserted"""
+    if not rows:
+        return 0
+    # Core execution on the session's connection: ORM bulk inserts report no rowcount
+    return db.connection().execute(
+        sqlite_insert(model).on_conflict_do_nothing(index_elements=conflict_columns),
+        rows
+    ).rowcount
+
+
+def refresh_counters(db: Session, post_ids: Iterable[int], response_ids: Iterable[int]) -> None:
+    """
+    Recompute the denormalized counters, then the hot score, of the posts and
+    responses a batch touched (cf. forum_repo.reconcile_counters for the whole table)
+    """
+    for chunk in _chunks(list(post_ids)):
+        db.execute(
+            update(Post)
+            .where(Post.id.in_(chunk))
+            .values({
+                Post.like_count: select(func.count(PostLike.id)).where(PostLike.post_id == Post.id).scalar_subquery(),
+                Post.response_count: select(func.count(Response.id)).where(Response.post_id == Post.id).scalar_subquery(),
+                Post.updated_at: Post.updated_at
+            })
+            .execution_options(synchronize_session=False)
+        )
+        # A separate statement: SET expressions see the counters as they were before the UPDATE
+        db.execute(
+            update(Post)
+            .where(Post.id.in_(chunk))
+            .values({
+                Post.hot_score: func.hot_score(Post.like_count, Post.response_count, Post.created_at),
+                Post.updated_at: Post.updated_at
+            })
+            .execution_options(synchronize_session=False)
+        )
+    for chunk in _chunks(list(response_ids)):
+        db.execute(
+            update(Response)
+            .where(Response.id.in_(chunk))
+            .values({
+                Response.like_count: select(func.count(ResponseLike.id)).where(ResponseLike.response_id == Response.id).scalar_subquery(),
+                Response.updated_at: Response.updated_at
+            })
+            .execution_options(synchronize_session=False)
+        )
@@ -1,37 +1,310 @@
 # repo/journal_repo.py
 from sqlalchemy.orm import Session
-from models.journal import Journal
+from sqlalchemy import Integer, String, cast, func, literal, select, tuple_, type_coerce
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.journal import Journal, JournalHumorDaily
+from core.pagination import encode_pinned_cursor
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+
+
+PinnedCursor = Optional[Tuple[bool, str, int]]
+SyncPosition = Optional[Tuple[str, int]]
+
+# Tombstones older than this are purged; sync tokens older than this get a full resync
+TOMBSTONE_RETENTION_DAYS = 90
 
 
 def create(db: Session, journal: Journal):
     """Create a new journal entry"""
-    db.add(journal)
+    add(db, journal)
     db.commit()
     db.refresh(journal)
     return journal
 
 
-def get_by_user(db: Session, user_id: int):
-    """Get all journals for user, ordered by pinned first then date"""
-    return (
-        db.query(Journal)
-        .filter(Journal.user_id == user_id)
-        .order_by(Journal.is_pinned.desc(), Journal.created_at.desc())
+def add(db: Session, journal: Journal) -> None:
+    """Insert a journal and count it in the humor rollup, without committing"""
+    db.add(journal)
+    db.flush()
+    bump_humor_rollup(db, journal.id, 1)
+
+
+def get_by_user(
+    db: Session,
+    user_id: int,
+    after: PinnedCursor = None,
+    limit: int = 50,
+    pinned: Optional[bool] = None,
+    humor: Optional[str] = None,
+    color: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> Tuple[List[Journal], Optional[str]]:
+    """
+    Get a page of a user's journals, pinned first then newest first, starting
+    after an (is_pinned, created_at, id) keyset cursor. A backward range scan of
+    ix_journals_user_pinned_created, whatever the length of the history.
+    Returns (journals, next_cursor); next_cursor is None on the last page.
+    """
+    # created_at is compared and carried in cursors as stored text: rows written by
+    # the server default and by Python have different formats, and re-rendering a
+    # cursor datetime would not compare equal to its own row
+    created_at = type_coerce(Journal.created_at, String)
+    query = db.query(Journal, created_at).filter(Journal.user_id == user_id, Journal.deleted_at.is_(None))
+    if pinned is not None:
+        query = query.filter(Journal.is_pinned == pinned)
+    if humor is not None:
+        query = query.filter(Journal.humor == humor)
+    if color is not None:
+        query = query.filter(Journal.color == color)
+    if date_from is not None:
+        query = query.filter(created_at >= literal(date_from.isoformat(), String))
+    if date_to is not None:
+        query = query.filter(created_at < literal((date_to + timedelta(days=1)).isoformat(), String))
+    if after is not None:
+        is_pinned, after_created_at, after_id = after
+        query = query.filter(
+            tuple_(Journal.is_pinned, created_at, Journal.id)
+            < tuple_(literal(is_pinned), literal(after_created_at, String), literal(after_id))
+        )
+    rows = (
+        query.order_by(Journal.is_pinned.desc(), Journal.created_at.desc(), Journal.id.desc())
+        .limit(limit + 1)
         .all()
     )
+    journals = [journal for journal, _ in rows[:limit]]
+    if len(rows) <= limit:
+        return journals, None
+    last, last_created_at = rows[limit - 1]
+    return journals, encode_pinned_cursor(last.is_pinned, last_created_at, last.id)
 
 
 def get_one(db: Session, journal_id: int):
     """Get a single journal by ID"""
-    return db.query(Journal).filter(Journal.id == journal_id).first()
+    return db.query(Journal).filter(Journal.id == journal_id, Journal.deleted_at.is_(None)).first()
 
 
 def delete(db: Session, journal: Journal):
-    """Delete a journal entry"""
-    db.delete(journal)
+    """Delete a journal entry (leaves a tombstone for sync clients)"""
+    tombstone(db, journal)
     db.commit()
 
 
+def tombstone(db: Session, journal: Journal) -> None:
+    """
+    Turn a journal into a tombstone, without committing: uncounted from the
+    rollup, content cleared, deleted_at set. updated_at moves with it, so the
+    deletion shows up in the user's change stream.
+    """
+    bump_humor_rollup(db, journal.id, -1)
+    journal.title = None
+    journal.content = None
+    journal.deleted_at = datetime.utcnow()
+
+
 def update(db: Session):
     """Commit changes to database"""
     db.commit()
+
+
+# =====================================================
+# HUMOR ROLLUP
+# =====================================================
+# journal_humor_daily holds one count per (user, day, humor), updated in the
+# same transaction as the journal write, so reports never scan journals.
+
+def bump_humor_rollup(db: Session, journal_id: int, delta: int, humor: Optional[str] = None) -> None:
+    """
+    Add delta to the rollup cell of a journal (its user, day and humor, or the
+    given humor when it is changing). Reads the journal row in SQL, so the day is
+    the same date(created_at) the backfill computes. Empty cells are removed.
+    """
+    cell = select(
+        Journal.user_id,
+        func.date(Journal.created_at),
+        literal(humor) if humor is not None else Journal.humor,
+        literal(delta)
+    ).where(Journal.id == journal_id)
+    insert = sqlite_insert(JournalHumorDaily).from_select(
+        ["user_id", "date", "humor", "count"], cell
+    )
+    db.execute(
+        insert.on_conflict_do_update(
+            index_elements=["user_id", "date", "humor"],
+            set_={"count": JournalHumorDaily.count + insert.excluded.count}
+        )
+    )
+    if delta < 0:
+        user_id = select(Journal.user_id).where(Journal.id == journal_id).scalar_subquery()
+        db.query(JournalHumorDaily).filter(
+            JournalHumorDaily.user_id == user_id, JournalHumorDaily.count <= 0
+        ).delete(synchronize_session=False)
+
+
+def get_humor_rollup(db: Session, user_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None, granularity: str = "day") -> List[Tuple[str, str, int]]:
+    """
+    (humor, period start, count) rows of a user, summed per day, week (starting
+    Monday) or month, oldest first. date_from/date_to are inclusive days.
+    """
+    day = JournalHumorDaily.date
+    if granularity == "week":
+        period = func.date(day, "-6 days", "weekday 1")
+    elif granularity == "month":
+        period = func.strftime("%Y-%m-01", day)
+    else:
+        period = func.date(day)
+
+    query = db.query(JournalHumorDaily.humor, period, func.sum(JournalHumorDaily.count)).filter(
+        JournalHumorDaily.user_id == user_id
+    )
+    if date_from is not None:
+        query = query.filter(day >= date_from)
+    if date_to is not None:
+        query = query.filter(day <= date_to)
+    return query.group_by(JournalHumorDaily.humor, period).order_by(period, JournalHumorDaily.humor).all()
+
+
+def get_mood_timeline(db: Session, user_id: int) -> List[Tuple[int, str]]:
+    """(created_at as unix seconds, humor) of a user's live journals, unordered"""
+    return db.execute(
+        select(cast(func.strftime("%s", Journal.created_at), Integer), Journal.humor)
+        .where(Journal.user_id == user_id, Journal.deleted_at.is_(None))
+    ).all()
+
+
+def get_last_write(db: Session, user_id: int) -> Optional[str]:
+    """
+    Stored updated_at of a user's latest journal write, tombstones included:
+    changes on every create, edit and delete. One probe of ix_journals_user_updated.
+    """
+    return db.execute(
+        select(func.max(type_coerce(Journal.updated_at, String))).where(Journal.user_id == user_id)
+    ).scalar()
+
+
+def rebuild_humor_rollup(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute the rollup from journals (all users, or one). Returns the number of cells"""
+    clear = db.query(JournalHumorDaily)
+    source = select(
+        Journal.user_id, func.date(Journal.created_at), Journal.humor, func.count(Journal.id)
+    ).where(Journal.deleted_at.is_(None))
+    if user_id is not None:
+        clear = clear.filter(JournalHumorDaily.user_id == user_id)
+        source = source.where(Journal.user_id == user_id)
+    source = source.group_by(Journal.user_id, func.date(Journal.created_at), Journal.humor)
+
+    clear.delete(synchronize_session=False)
+    cells = db.execute(
+        sqlite_insert(JournalHumorDaily).from_select(["user_id", "date", "humor", "count"], source)
+    ).rowcount
+    db.commit()
+    return cells
+
+
+# =====================================================
+# DELTA SYNC
+# =====================================================
+# A user's change stream is their journals (live and tombstones) ordered by
+# (updated_at, id) on ix_journals_user_updated. updated_at is compared as
+# stored text, like created_at in get_by_user.
+
+def storage_timestamp(value: datetime) -> str:
+    """A naive UTC datetime as SQLAlchemy stores it, for comparison with stored text"""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def get_changes(db: Session, user_id: int, after: SyncPosition = None, limit: int = 500) -> Tuple[List[Tuple[Journal, str]], bool]:
+    """
+    (journal, stored updated_at) of a user's journals changed after an
+    (updated_at, id) position, oldest change first, tombstones included.
+    Without a position, the live journals only (initial sync). One forward
+    range scan of ix_journals_user_updated: a single probe when nothing changed.
+    Returns (rows, has_more).
+    """
+    updated_at = type_coerce(Journal.updated_at, String)
+    query = db.query(Journal, updated_at).filter(Journal.user_id == user_id)
+    if after is None:
+        query = query.filter(Journal.deleted_at.is_(None))
+    else:
+        after_updated_at, after_id = after
+        query = query.filter(
+            tuple_(updated_at, Journal.id) > tuple_(literal(after_updated_at, String), literal(after_id))
+        )
+    rows = query.order_by(Journal.updated_at, Journal.id).limit(limit + 1).all()
+    return [tuple(row) for row in rows[:limit]], len(rows) > limit
+
+
+def get_for_sync(db: Session, user_id: int, journal_ids: List[int]) -> Dict[int, Journal]:
+    """A user's journals (tombstones included) among the given ids, by id"""
+    if not journal_ids:
+        return {}
+    journals = db.query(Journal).filter(Journal.user_id == user_id, Journal.id.in_(set(journal_ids))).all()
+    return {journal.id: journal for journal in journals}
+
+
+def purge_tombstones(db: Session, retention_days: int = TOMBSTONE_RETENTION_DAYS) -> int:
+    """Delete tombstones older than the retention. Returns the number purged"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    purged = db.query(Journal).filter(
+        Journal.deleted_at.isnot(None), Journal.deleted_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return purged
+
+
+# =====================================================
+# EXPORT
+# =====================================================
+
+EXPORT_COLUMNS = (
+    Journal.id, Journal.humor, Journal.title, Journal.content, Journal.is_pinned,
+    Journal.color, Journal.report, Journal.created_at, Journal.updated_at
+)
+
+
+def get_export_page(db: Session, user_id: int, after: PinnedCursor = None, limit: int = 500) -> Tuple[List[dict], PinnedCursor]:
+    """
+    A page of a user's live journals as plain dicts of EXPORT_COLUMNS (no ORM
+    objects), pinned first then newest first like the app lists them, after an
+    (is_pinned, created_at, id) keyset position: a range scan of
+    ix_journals_user_pinned_created. Returns (rows, position of the last row or
+    None on the last page).
+    """
+    created_at = type_coerce(Journal.created_at, String)
+    query = select(*EXPORT_COLUMNS, created_at.label("position")).where(
+        Journal.user_id == user_id, Journal.deleted_at.is_(None)
+    )
+    if after is not None:
+        is_pinned, after_created_at, after_id = after
+        query = query.where(
+            tuple_(Journal.is_pinned, created_at, Journal.id)
+            < tuple_(literal(is_pinned), literal(after_created_at, String), literal(after_id))
+        )
+    rows = [
+        dict(row._mapping) for row in db.execute(
+            query.order_by(Journal.is_pinned.desc(), Journal.created_at.desc(), Journal.id.desc()).limit(limit)
+        )
+    ]
+    for row in rows:
+        last_created_at = row.pop("position")
+    if len(rows) < limit:
+        return rows, None
+    return rows, (rows[-1]["is_pinned"], last_created_at, rows[-1]["id"])
+
+
+def get_humor_rollup_page(db: Session, user_id: int, after: Optional[Tuple[date, str]] = None, limit: int = 500) -> Tuple[List[tuple], Optional[Tuple[date, str]]]:
+    """
+    A page of a user's daily humor rollup cells (date, humor, count), oldest
+    first, after a (date, humor) keyset position (the primary key order).
+    Returns (rows, position of the last row or None on the last page).
+    """
+    query = select(JournalHumorDaily.date, JournalHumorDaily.humor, JournalHumorDaily.count).where(
+        JournalHumorDaily.user_id == user_id
+    )
+    if after is not None:
+        query = query.where(tuple_(JournalHumorDaily.date, JournalHumorDaily.humor) > tuple_(literal(after[0]), literal(after[1])))
+    rows = [tuple(row) for row in db.execute(query.order_by(JournalHumorDaily.date, JournalHumorDaily.humor).limit(limit))]
+    if len(rows) < limit:
+        return rows, None
+    return rows, rows[-1][:2]
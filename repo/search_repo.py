@@ -0,0 +1,239 @@
+# repo/search_repo.py
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from core.pagination import encode_rank_cursor
+
+
+# =====================================================
+# FORUM SEARCH (SQLite FTS5)
+# =====================================================
+# One FTS row per post (rowid = id * 2) and per response (rowid = id * 2 + 1),
+# so triggers can find a row to update or delete by rowid without a scan.
+
+FORUM_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS forum_search USING fts5(
+        title,
+        content,
+        kind UNINDEXED,
+        item_id UNINDEXED,
+        post_id UNINDEXED,
+        forum_id UNINDEXED,
+        created_at UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_search_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO forum_search (rowid, title, content, kind, item_id, post_id, forum_id, created_at)
+        VALUES (new.id * 2, new.title, new.content, 'post', new.id, new.id, new.forum_id, new.created_at);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_search_update AFTER UPDATE OF title, content ON posts BEGIN
+        UPDATE forum_search SET title = new.title, content = new.content WHERE rowid = new.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_search_delete AFTER DELETE ON posts BEGIN
+        DELETE FROM forum_search WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_search_soft_delete AFTER UPDATE OF deleted_at ON posts
+    WHEN new.deleted_at IS NOT NULL AND old.deleted_at IS NULL BEGIN
+        DELETE FROM forum_search WHERE rowid = old.id * 2;
+        DELETE FROM forum_search WHERE rowid IN (SELECT id * 2 + 1 FROM responses WHERE post_id = old.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS responses_search_insert AFTER INSERT ON responses BEGIN
+        INSERT INTO forum_search (rowid, title, content, kind, item_id, post_id, forum_id, created_at)
+        VALUES (
+            new.id * 2 + 1, NULL, new.content, 'response', new.id, new.post_id,
+            (SELECT forum_id FROM posts WHERE id = new.post_id), new.created_at
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS responses_search_update AFTER UPDATE OF content ON responses BEGIN
+        UPDATE forum_search SET content = new.content WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS responses_search_delete AFTER DELETE ON responses BEGIN
+        DELETE FROM forum_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+
+def init_forum_search(engine: Engine) -> None:
+    """Create the forum FTS5 table and the triggers keeping it in sync (idempotent)"""
+    with engine.begin() as conn:
+        for ddl in FORUM_SEARCH_DDL:
+            conn.execute(text(ddl))
+
+
+def rebuild_forum_search(db: Session) -> int:
+    """Repopulate the forum search index from posts and responses. Returns the row count"""
+    db.execute(text("DELETE FROM forum_search"))
+    db.execute(text("""
+        INSERT INTO forum_search (rowid, title, content, kind, item_id, post_id, forum_id, created_at)
+        SELECT id * 2, title, content, 'post', id, id, forum_id, created_at FROM posts
+        WHERE deleted_at IS NULL
+    """))
+    db.execute(text("""
+        INSERT INTO forum_search (rowid, title, content, kind, item_id, post_id, forum_id, created_at)
+        SELECT r.id * 2 + 1, NULL, r.content, 'response', r.id, r.post_id, p.forum_id, r.created_at
+        FROM responses r JOIN posts p ON p.id = r.post_id
+        WHERE p.deleted_at IS NULL
+    """))
+    db.execute(text("INSERT INTO forum_search (forum_search) VALUES ('optimize')"))
+    db.commit()
+    return db.execute(text("SELECT count(*) FROM forum_search")).scalar()
+
+
+def to_match_query(q: str) -> str:
+    """Quote each search term so user input is never parsed as FTS5 syntax"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def search_forum(
+    db: Session,
+    q: str,
+    forum_id: Optional[int] = None,
+    after: Optional[Tuple[float, int]] = None,
+    limit: int = 20
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Full-text search over post titles/contents and response contents, best
+    BM25 match first (title hits weigh more), with a highlighted snippet.
+    Returns (results, next_cursor).
+    """
+    sql = """
+        SELECT rowid, kind, item_id, post_id, forum_id, created_at,
+               highlight(forum_search, 0, '<mark>', '</mark>') AS title,
+               snippet(forum_search, 1, '<mark>', '</mark>', '…', 16) AS snippet,
+               bm25(forum_search, 4.0, 1.0) AS rank
+        FROM forum_search
+        WHERE forum_search MATCH :match
+    """
+    params = {"match": to_match_query(q), "limit": limit + 1}
+    if forum_id is not None:
+        sql += " AND forum_id = :forum_id"
+        params["forum_id"] = forum_id
+    if after is not None:
+        sql += """ AND (bm25(forum_search, 4.0, 1.0) > :after_rank
+                   OR (bm25(forum_search, 4.0, 1.0) = :after_rank AND rowid > :after_rowid))"""
+        params["after_rank"], params["after_rowid"] = after
+    sql += " ORDER BY rank, rowid LIMIT :limit"
+
+    rows = [dict(row) for row in db.execute(text(sql), params).mappings()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_rank_cursor(rows[-1]["rank"], rows[-1]["rowid"])
+
+
+# =====================================================
+# JOURNAL SEARCH (SQLite FTS5)
+# =====================================================
+# One FTS row per journal (rowid = journal id). Journals are private, so the
+# owner is indexed as a "u<user_id>" token in user_key and every query ANDs it
+# in: FTS5 intersects the posting lists instead of filtering other users' hits.
+
+JOURNAL_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS journal_search USING fts5(
+        title,
+        content,
+        user_key,
+        humor UNINDEXED,
+        created_at UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS journals_search_insert AFTER INSERT ON journals BEGIN
+        INSERT INTO journal_search (rowid, title, content, user_key, humor, created_at)
+        VALUES (new.id, new.title, new.content, 'u' || new.user_id, new.humor, new.created_at);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS journals_search_update AFTER UPDATE OF title, content, humor ON journals BEGIN
+        UPDATE journal_search SET title = new.title, content = new.content, humor = new.humor
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS journals_search_delete AFTER DELETE ON journals BEGIN
+        DELETE FROM journal_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS journals_search_tombstone AFTER UPDATE OF deleted_at ON journals
+    WHEN new.deleted_at IS NOT NULL BEGIN
+        DELETE FROM journal_search WHERE rowid = new.id;
+    END
+    """,
+]
+
+
+def init_journal_search(engine: Engine) -> None:
+    """Create the journal FTS5 table and the triggers keeping it in sync (idempotent)"""
+    with engine.begin() as conn:
+        for ddl in JOURNAL_SEARCH_DDL:
+            conn.execute(text(ddl))
+
+
+def rebuild_journal_search(db: Session) -> int:
+    """Repopulate the journal search index from journals. Returns the row count"""
+    db.execute(text("DELETE FROM journal_search"))
+    db.execute(text("""
+        INSERT INTO journal_search (rowid, title, content, user_key, humor, created_at)
+        SELECT id, title, content, 'u' || user_id, humor, created_at FROM journals
+        WHERE deleted_at IS NULL
+    """))
+    db.execute(text("INSERT INTO journal_search (journal_search) VALUES ('optimize')"))
+    db.commit()
+    return db.execute(text("SELECT count(*) FROM journal_search")).scalar()
+
+
+def search_journals(
+    db: Session,
+    user_id: int,
+    q: str,
+    after: Optional[Tuple[float, int]] = None,
+    limit: int = 20
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Full-text search over one user's journal titles and contents, best BM25
+    match first (title hits weigh more), with a highlighted snippet.
+    Returns (results, next_cursor).
+    """
+    sql = """
+        SELECT rowid AS journal_id, humor, created_at,
+               highlight(journal_search, 0, '<mark>', '</mark>') AS title,
+               snippet(journal_search, 1, '<mark>', '</mark>', '…', 16) AS snippet,
+               bm25(journal_search, 4.0, 1.0, 0.0) AS rank
+        FROM journal_search
+        WHERE journal_search MATCH :match
+    """
+    params = {
+        "match": f'user_key : "u{int(user_id)}" AND {{title content}} : ({to_match_query(q)})',
+        "limit": limit + 1
+    }
+    if after is not None:
+        sql += """ AND (bm25(journal_search, 4.0, 1.0, 0.0) > :after_rank
+                   OR (bm25(journal_search, 4.0, 1.0, 0.0) = :after_rank AND rowid > :after_rowid))"""
+        params["after_rank"], params["after_rowid"] = after
+    sql += " ORDER BY rank, rowid LIMIT :limit"
+
+    rows = [dict(row) for row in db.execute(text(sql), params).mappings()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_rank_cursor(rows[-1]["rank"], rows[-1]["journal_id"])
@@ -6,6 +6,11 @@ def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
 
+def user_exists(db: Session, user_id: int) -> bool:
+    """True if a user with this id exists (a primary key probe, the row is not loaded)"""
+    return db.query(User.id).filter(User.id == user_id).first() is not None
+
+
 def create_user(
     db: Session,
     email: str,
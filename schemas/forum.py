@@ -1,6 +1,6 @@
 # schemas/forum.py
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -41,7 +41,7 @@ class PostUpdate(BaseModel):
 class PostResponse(BaseModel):
     id: int
     forum_id: int
-    author_id: int
+    author_id: Optional[int] = None  # None on anonymous posts, except for their author
     author_name: str  # Add this field
     title: str
     content: str
@@ -55,6 +55,11 @@ class PostResponse(BaseModel):
         from_attributes = True
 
 
+class PostPaginatedResponse(BaseModel):
+    posts: List[PostResponse]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to get the next page
+
+
 # Response Schemas
 class ResponseCreate(BaseModel):
     post_id: int
@@ -68,7 +73,7 @@ class ResponseUpdate(BaseModel):
 class ResponseResponse(BaseModel):
     id: int
     post_id: int
-    author_id: int
+    author_id: Optional[int] = None  # None on anonymous responses, except for their author
     author_name: str
     content: str
     is_anonymous: bool
@@ -79,10 +84,99 @@ class ResponseResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ResponsePaginatedResponse(BaseModel):
+    responses: List[ResponseResponse]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to get the next page
+
+class ForumSearchResult(BaseModel):
+    kind: str  # "post" or "response"
+    item_id: int
+    post_id: int
+    forum_id: int
+    title: Optional[str]  # Highlighted post title, None for responses
+    snippet: str  # Highlighted excerpt of the matching content
+    created_at: datetime
+    rank: float  # BM25 score, lower is a better match
+
+class ForumSearchPaginatedResponse(BaseModel):
+    results: List[ForumSearchResult]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to get the next page
+
+class LikedIdsResponse(BaseModel):
+    user_id: int
+    liked_ids: List[int]  # Subset of the requested ids the user has liked
+
+class ThreadResponse(BaseModel):
+    post: PostResponse
+    responses: List[ResponseResponse]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to get more responses
+
 # Report Schema
 class ReportContent(BaseModel):
     reason: str
 
+# Moderation Schemas
+class ModerationQueueItem(BaseModel):
+    kind: str  # "post" or "response"
+    id: int
+    post_id: int
+    forum_id: int
+    title: Optional[str]  # None for responses
+    content: str
+    author_id: int
+    report_reason: Optional[str]
+    reported_at: datetime
+
+class ModerationQueueResponse(BaseModel):
+    items: List[ModerationQueueItem]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to get the next page
+
+class ModerationTarget(BaseModel):
+    kind: Literal["post", "response"]
+    id: int
+
+class ModerationAction(BaseModel):
+    moderator_id: int
+    items: List[ModerationTarget] = Field(..., min_length=1, max_length=500)
+
+class ModerationResult(BaseModel):
+    posts: int  # Number of posts affected
+    responses: int  # Number of responses affected
+
+# Bulk Import Schemas
+# One NDJSON record each, tagged with "type"; ids and parent ids are those of the source system
+class ForumImport(ForumCreate):
+    id: int
+    created_at: Optional[datetime] = None
+
+class PostImport(PostCreate):
+    id: int
+    created_at: Optional[datetime] = None
+
+class ResponseImport(ResponseCreate):
+    id: int
+    created_at: Optional[datetime] = None
+
+class PostLikeImport(BaseModel):
+    post_id: int
+    user_id: int
+    created_at: Optional[datetime] = None
+
+class ResponseLikeImport(BaseModel):
+    response_id: int
+    user_id: int
+    created_at: Optional[datetime] = None
+
+class ImportResult(BaseModel):
+    import_id: str
+    resumed_from: int  # Lines already committed by an earlier run, skipped this time
+    lines: int  # Last line committed
+    inserted: dict  # Rows inserted per record type
+    skipped: int  # Invalid or unresolvable records
+    errors: List[str]  # First skipped records, with their line numbers
+    seconds: float
+    rows_per_second: float
+
 
 
 
@@ -1,6 +1,6 @@
 # schemas/journal.py
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -34,4 +34,81 @@ class JournalOut(BaseModel):
     updated_at: datetime  # Add this
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class JournalPaginatedResponse(BaseModel):
+    journals: List[JournalOut]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to get the next page
+
+
+class JournalSearchResult(BaseModel):
+    journal_id: int
+    title: Optional[str]  # Highlighted title
+    snippet: Optional[str]  # Highlighted excerpt of the matching content
+    humor: str
+    created_at: datetime
+    rank: float  # BM25 score, lower is a better match
+
+
+class JournalSearchPaginatedResponse(BaseModel):
+    results: List[JournalSearchResult]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to get more results
+
+
+
+class JournalTombstone(BaseModel):
+    id: int
+    deleted_at: datetime
+
+
+class JournalSyncResponse(BaseModel):
+    changes: List[JournalOut]  # Created or edited since the token, oldest first
+    deleted: List[JournalTombstone]  # Deleted since the token
+    next_token: str  # Pass back as ?since= on the next sync
+    has_more: bool  # More changes are waiting: sync again right away
+    reset: bool = False  # Token too old: drop local journals, these changes are a full sync
+
+
+# Journal columns declared NOT NULL (title and content are nullable)
+NOT_NULL_FIELDS = {"humor", "is_pinned", "color"}
+
+
+class JournalSyncChange(JournalUpdate):
+    id: Optional[int] = None  # None for a journal created offline
+    client_id: Optional[str] = None  # Client-side key of a created journal, echoed back with its id
+    updated_at: datetime  # When the change was made on the device (last writer wins)
+    created_at: Optional[datetime] = None  # Creation time of an offline journal
+    deleted: bool = False
+
+    @model_validator(mode="after")
+    def check_create(self):
+        if self.id is None and not self.deleted and self.humor is None:
+            raise ValueError("humor is required to create a journal")
+        return self
+
+    @model_validator(mode="after")
+    def check_not_null(self):
+        # Omitted fields are left alone, but an explicit null would reach a NOT NULL column
+        if not self.deleted:
+            for field in NOT_NULL_FIELDS & self.model_fields_set:
+                if getattr(self, field) is None:
+                    raise ValueError(f"{field} cannot be null")
+        return self
+
+
+class JournalSyncRequest(BaseModel):
+    changes: List[JournalSyncChange] = Field(..., min_length=1, max_length=500)
+
+
+class JournalSyncCreated(BaseModel):
+    client_id: Optional[str]
+    id: int
+
+
+class JournalSyncResult(BaseModel):
+    created: List[JournalSyncCreated]
+    applied: List[int]  # Ids updated or deleted by the client's changes
+    conflicts: List[JournalOut]  # The server version was newer and wins: replace the local copy
+    deleted: List[JournalTombstone]  # Changes to journals already deleted: drop the local copy
+    rejected: List[int]  # Ids that do not exist or belong to another user
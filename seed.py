@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from core.database import SessionLocal
 from models.user import User
 from models.journal import Journal
+from repo import journal_repo
 from datetime import datetime, timedelta
 
 
@@ -230,6 +231,9 @@ def seed_journals_for_user():
         
         db.commit()
         
+        # Journals were inserted directly: recompute the humor report rollup
+        journal_repo.rebuild_humor_rollup(db, user_id=1)
+        
         print("\n" + "="*50)
         print("✅ Journals seeding completed successfully!")
         print("="*50)
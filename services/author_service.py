@@ -0,0 +1,75 @@
+# services/author_service.py
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from core.cache import TTLCache
+from models.user import User
+
+
+UNKNOWN_AUTHOR = "Unknown User"
+ANONYMOUS_AUTHOR = "Anonymous"
+
+
+_author_names = TTLCache()
+
+
+def author_name(author: Optional[User]) -> str:
+    """Extract author name (email prefix if no full name)"""
+    if not author:
+        return UNKNOWN_AUTHOR
+    if hasattr(author, 'full_name') and author.full_name:
+        return author.full_name
+    if hasattr(author, 'first_name') and author.first_name:
+        last_name = getattr(author, 'last_name', '')
+        return f"{author.first_name} {last_name}".strip()
+    if author.email:
+        return author.email.split('@')[0]
+    return UNKNOWN_AUTHOR
+
+
+def resolve_author_names(db: Session, user_ids: Iterable[int]) -> Dict[int, str]:
+    """
+    Map user ids to display names.
+    Cached names are reused; all misses are loaded with a single query.
+    """
+    names = {}
+    missing = set()
+    for user_id in set(user_ids):
+        cached = _author_names.get(user_id)
+        if cached is None:
+            missing.add(user_id)
+        else:
+            names[user_id] = cached
+
+    if missing:
+        for user in db.query(User).filter(User.id.in_(missing)).all():
+            names[user.id] = author_name(user)
+            _author_names.set(user.id, names[user.id])
+            missing.discard(user.id)
+        # Deleted users are not cached so a reused id is never mislabelled
+        for user_id in missing:
+            names[user_id] = UNKNOWN_AUTHOR
+
+    return names
+
+
+def display_name(name: str, is_anonymous: bool) -> str:
+    """Apply the anonymity rule: anonymous content never shows its author's name"""
+    return ANONYMOUS_AUTHOR if is_anonymous else name
+
+
+def display_author_id(author_id: int, is_anonymous: bool, viewer_id: Optional[int] = None) -> Optional[int]:
+    """Apply the anonymity rule to the author id: only the author still sees it on anonymous content"""
+    return author_id if not is_anonymous or author_id == viewer_id else None
+
+
+def invalidate_author(user_id: int) -> None:
+    """Drop a cached display name, e.g. after the user changed their profile"""
+    _author_names.discard(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    # ORM flushes only; bulk query.update() on users relies on the TTL instead
+    invalidate_author(target.id)
@@ -0,0 +1,128 @@
+# services/emotion_backends.py
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Type
+
+
+# =====================================================
+# EMOTION INFERENCE BACKENDS
+# =====================================================
+# A backend runs the emotion model on a list of texts and returns, per text,
+# the label/score list of every model label, exactly like the transformers
+# pipeline with top_k=None. llm_service maps those labels to our emotions, so
+# backends are interchangeable. EMOTION_BACKEND picks one per process:
+#   transformers  the PyTorch pipeline (default, downloads the model)
+#   onnx          ONNX Runtime on the int8 export of export_emotion_onnx.py,
+#                 only onnxruntime, tokenizers and numpy are imported
+# Heavy imports happen in load(), never at module import.
+
+EMOTION_MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "transformers")
+EMOTION_ONNX_DIR = os.getenv("EMOTION_ONNX_DIR", "onnx/emotion-english-distilroberta-base")
+ONNX_MODEL_FILE = "model.int8.onnx"
+MAX_TOKENS = 512  # distilroberta's position embeddings
+
+
+class EmotionBackend(ABC):
+    """Interface of an emotion inference backend"""
+
+    name = ""
+
+    @abstractmethod
+    def load(self) -> None:
+        """Import the runtime and load the model (slow, called once)"""
+
+    @abstractmethod
+    def predict(self, texts: List[str]) -> List[List[dict]]:
+        """Per text, [{"label": ..., "score": ...}] for every model label; not thread-safe"""
+
+
+class TransformersBackend(EmotionBackend):
+    """The transformers text-classification pipeline, on GPU if available"""
+
+    name = "transformers"
+
+    def __init__(self, model: str = EMOTION_MODEL_NAME):
+        self.model = model
+        self._pipeline = None
+
+    def load(self) -> None:
+        # Imported here: torch and transformers take seconds to import
+        from transformers import pipeline
+        import torch
+
+        # This model is specifically trained for emotion detection
+        self._pipeline = pipeline(
+            "text-classification",
+            model=self.model,
+            top_k=None,  # Return all emotions with probabilities
+            device=0 if torch.cuda.is_available() else -1  # Use GPU if available
+        )
+
+    def predict(self, texts: List[str]) -> List[List[dict]]:
+        # Long texts are cut at the model's 512 tokens
+        return self._pipeline(texts, batch_size=len(texts), truncation=True)
+
+
+class OnnxBackend(EmotionBackend):
+    """Dynamically int8-quantized ONNX export of the same model, on ONNX Runtime (CPU)"""
+
+    name = "onnx"
+
+    def __init__(self, model_dir: str = EMOTION_ONNX_DIR, threads: int = int(os.getenv("EMOTION_ONNX_THREADS", "0"))):
+        self.model_dir = model_dir
+        self.threads = threads  # 0 = one per physical core
+        self._session = None
+        self._tokenizer = None
+        self._labels: List[str] = []
+
+    def load(self) -> None:
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(self.model_dir, "config.json")) as f:
+            config = json.load(f)
+        self._labels = [config["id2label"][str(i)] for i in range(len(config["id2label"]))]
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=MAX_TOKENS)
+        pad_id = config.get("pad_token_id", 1)
+        self._tokenizer.enable_padding(pad_id=pad_id, pad_token=self._tokenizer.id_to_token(pad_id))
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = self.threads
+        self._session = onnxruntime.InferenceSession(
+            os.path.join(self.model_dir, ONNX_MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+
+    def predict(self, texts: List[str]) -> List[List[dict]]:
+        import numpy as np
+
+        encodings = self._tokenizer.encode_batch(texts)
+        logits = self._session.run(["logits"], {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+        })[0].astype(np.float64)
+        # Softmax, as the pipeline does for a single-label model
+        scores = np.exp(logits - logits.max(axis=1, keepdims=True))
+        scores /= scores.sum(axis=1, keepdims=True)
+        return [
+            [{"label": label, "score": score} for label, score in zip(self._labels, row)]
+            for row in scores.tolist()
+        ]
+
+
+BACKENDS: Dict[str, Type[EmotionBackend]] = {
+    TransformersBackend.name: TransformersBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def create_backend(name: str = EMOTION_BACKEND) -> EmotionBackend:
+    """A new, not yet loaded, backend by name"""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown emotion backend {name!r}, expected one of {', '.join(BACKENDS)}")
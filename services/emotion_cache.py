@@ -0,0 +1,140 @@
+# services/emotion_cache.py
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from starlette.concurrency import run_in_threadpool
+from core.cache import TTLCache
+from services.emotion_backends import EMOTION_BACKEND
+from core.database import SessionLocal
+from repo import emotion_repo
+from typing import Dict, List, Optional
+
+
+# =====================================================
+# EMOTION RESULT CACHE
+# =====================================================
+# Results are keyed by sha256(model version + normalized text), so re-saved
+# journals and reposted content reuse the first classification. Two tiers: an
+# in-process LRU with TTL, in front of the emotion_cache SQLite table shared by
+# all workers and restarts. Bump EMOTION_MODEL_VERSION whenever the model or
+# the label mapping changes; rows of other versions are purged. The version
+# names the backend too: int8 ONNX scores differ slightly from PyTorch ones.
+
+EMOTION_MODEL_VERSION = os.getenv("EMOTION_MODEL_VERSION", f"emotion-english-distilroberta-base/1/{EMOTION_BACKEND}")
+CACHE_MAX_AGE_DAYS = int(os.getenv("EMOTION_CACHE_MAX_AGE_DAYS", "90"))
+PURGE_INTERVAL_SECONDS = 24 * 3600
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalized text with whitespace collapsed (case is kept: the model is case-sensitive)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class EmotionCache:
+    """Two-tier cache of emotion results with hit/miss counters"""
+
+    def __init__(self, model_version: str = EMOTION_MODEL_VERSION, maxsize: int = 10_000, ttl: float = 3600.0):
+        self.model_version = model_version
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_version}\0{normalize_text(text)}".encode()).hexdigest()
+
+    def get(self, text: str) -> Optional[dict]:
+        """Memory tier only: answers a repeated text without leaving the event loop"""
+        emotions = self._memory.get(self.key(text))
+        if emotions is not None:
+            self._count(memory_hits=1)
+        return emotions
+
+    def get_many(self, keys: List[str]) -> Dict[str, dict]:
+        """
+        Bulk lookup for a batch: the memory tier, then one query for the keys it
+        missed. Database hits are promoted to memory. Misses are counted once per key.
+        """
+        found = {}
+        for key in set(keys):
+            emotions = self._memory.get(key)
+            if emotions is not None:
+                found[key] = emotions
+        memory_hits = len(found)
+
+        missing = [key for key in set(keys) if key not in found]
+        stored = {}
+        if missing:
+            db = SessionLocal()
+            try:
+                stored = emotion_repo.get_cached_emotions(db, missing)
+            except Exception as e:
+                print(f"Error reading the emotion cache: {e}")
+            finally:
+                db.close()
+        for key, emotions in stored.items():
+            self._memory.set(key, emotions)
+        found.update(stored)
+        self._count(memory_hits=memory_hits, db_hits=len(stored), misses=len(missing) - len(stored))
+        return found
+
+    def set_many(self, results: Dict[str, dict]) -> None:
+        """Store fresh results in both tiers (the database write is best effort)"""
+        for key, emotions in results.items():
+            self._memory.set(key, emotions)
+        db = SessionLocal()
+        try:
+            emotion_repo.save_cached_emotions(db, self.model_version, results)
+        except Exception as e:
+            print(f"Error writing the emotion cache: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "model_version": self.model_version,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    def _count(self, memory_hits: int = 0, db_hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.db_hits += db_hits
+            self.misses += misses
+
+
+emotion_cache = EmotionCache()
+
+
+def purge_emotion_cache() -> int:
+    """Purge outdated cache rows in a dedicated session"""
+    db = SessionLocal()
+    try:
+        return emotion_repo.purge_cached_emotions(db, EMOTION_MODEL_VERSION, CACHE_MAX_AGE_DAYS)
+    finally:
+        db.close()
+
+
+async def purge_emotion_cache_loop(interval: float = PURGE_INTERVAL_SECONDS):
+    """Background task: drop cached results of other model versions or past the max age"""
+    while True:
+        try:
+            await run_in_threadpool(purge_emotion_cache)
+        except Exception as e:
+            print(f"Error purging the emotion cache: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,285 @@
+# services/forum_import.py
+import json
+import time
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from models.forum import Forum, ForumModerator, Post, Response, PostLike, ResponseLike
+from repo import import_repo
+from schemas.forum import ForumImport, PostImport, ResponseImport, PostLikeImport, ResponseLikeImport
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+
+
+# =====================================================
+# BULK NDJSON IMPORT
+# =====================================================
+# One JSON record per line, tagged with its type:
+#   {"type": "forum", "id": 1, "name": ..., "thematic": ..., "moderator_ids": [...]}
+#   {"type": "post", "id": 10, "forum_id": 1, "user_id": 3, "title": ..., "content": ...}
+#   {"type": "response", "id": 100, "post_id": 10, "user_id": 4, "content": ...}
+#   {"type": "post_like", "post_id": 10, "user_id": 5}
+#   {"type": "response_like", "response_id": 100, "user_id": 5}
+# Forum/post/response ids are those of the source system and are mapped to
+# local ids; user ids must already exist locally. A record may only reference
+# parents from earlier lines. Forums whose name already exists are reused.
+# Records are buffered and written in batches: each batch is one transaction
+# of executemany INSERTs that also saves the id map and the checkpoint, so
+# re-running an import with the same import_id resumes after the last batch.
+
+IMPORT_SCHEMAS = {
+    "forum": ForumImport,
+    "post": PostImport,
+    "response": ResponseImport,
+    "post_like": PostLikeImport,
+    "response_like": ResponseLikeImport,
+}
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 50
+
+
+class ImportStats:
+    """Progress of one import run"""
+
+    def __init__(self, import_id: str, resumed_from: int):
+        self.import_id = import_id
+        self.resumed_from = resumed_from
+        self.lines = resumed_from
+        self.inserted = {kind: 0 for kind in IMPORT_SCHEMAS}
+        self.skipped = 0
+        self.errors: List[str] = []
+        self.started = time.perf_counter()
+
+    def skip(self, line_no: int, reason: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line_no}: {reason}")
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return sum(self.inserted.values()) / max(self.seconds, 1e-9)
+
+    def as_dict(self) -> dict:
+        return {
+            "import_id": self.import_id,
+            "resumed_from": self.resumed_from,
+            "lines": self.lines,
+            "inserted": dict(self.inserted),
+            "skipped": self.skipped,
+            "errors": list(self.errors),
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+class ForumImporter:
+    """
+    Feeds NDJSON lines into batched inserts. Call start(), then add_lines()
+    as often as needed, then flush(); run() does all three for an iterable.
+    """
+
+    def __init__(self, db: Session, import_id: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 on_batch: Optional[Callable[[ImportStats], None]] = None):
+        self.db = db
+        self.import_id = import_id
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        self.stats: Optional[ImportStats] = None
+        self._pending: Dict[str, List[Tuple[int, object]]] = {kind: [] for kind in IMPORT_SCHEMAS}
+        self._pending_count = 0
+        self._last_line = 0
+
+    def start(self) -> ImportStats:
+        """Load the checkpoint and id map of an earlier run, if any"""
+        resumed_from = import_repo.get_checkpoint(self.db, self.import_id)
+        self.id_map = import_repo.load_id_map(self.db, self.import_id)
+        for kind in ("forum", "post", "response"):
+            self.id_map.setdefault(kind, {})
+        self.stats = ImportStats(self.import_id, resumed_from)
+        self._last_line = resumed_from
+        return self.stats
+
+    def add_lines(self, lines: Iterable[Tuple[int, str]]) -> None:
+        """Parse and buffer numbered lines, writing a batch whenever the buffer is full"""
+        for line_no, line in lines:
+            if line_no <= self.stats.resumed_from:
+                continue
+            self._last_line = line_no
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                self.stats.skip(line_no, "invalid JSON")
+                continue
+            kind = data.get("type") if isinstance(data, dict) else None
+            if kind not in IMPORT_SCHEMAS:
+                self.stats.skip(line_no, f"unknown record type {kind!r}")
+                continue
+            try:
+                record = IMPORT_SCHEMAS[kind].model_validate(data)
+            except ValidationError as e:
+                error = e.errors()[0]
+                self.stats.skip(line_no, f"{'.'.join(map(str, error['loc']))}: {error['msg']}")
+                continue
+            self._pending[kind].append((line_no, record))
+            self._pending_count += 1
+            if self._pending_count >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered records, id map and checkpoint in one transaction"""
+        if self._last_line <= self.stats.lines:
+            return
+        try:
+            self._write_batch()
+            import_repo.save_checkpoint(self.db, self.import_id, self._last_line)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self._pending = {kind: [] for kind in IMPORT_SCHEMAS}
+            self._pending_count = 0
+        self.stats.lines = self._last_line
+        if self.on_batch:
+            self.on_batch(self.stats)
+
+    def run(self, lines: Iterable[str]) -> ImportStats:
+        """Import an iterable of NDJSON lines (e.g. an open file)"""
+        self.start()
+        self.add_lines(enumerate(lines, 1))
+        self.flush()
+        return self.stats
+
+    # ----- batch writing, parents first -----
+
+    def _write_batch(self) -> None:
+        pending = self._pending
+        user_ids = import_repo.get_existing_user_ids(self.db, (
+            user_id
+            for records in pending.values()
+            for _, record in records
+            for user_id in (record.moderator_ids if isinstance(record, ForumImport) else [record.user_id])
+        ))
+        touched_posts = set()
+        touched_responses = set()
+
+        self._write_forums(self._unseen("forum", pending["forum"]), user_ids)
+
+        posts = self._resolve(self._unseen("post", pending["post"]), user_ids, "forum", "forum_id")
+        post_ids = import_repo.insert_returning_ids(self.db, Post, [
+            {
+                "forum_id": forum_id,
+                "author_id": record.user_id,
+                "title": record.title,
+                "content": record.content,
+                "is_anonymous": record.is_anonymous,
+                **self._timestamps(record, updated=True),
+            }
+            for record, forum_id in posts
+        ])
+        self._map("post", [record.id for record, _ in posts], post_ids)
+        touched_posts.update(post_ids)
+
+        responses = self._resolve(self._unseen("response", pending["response"]), user_ids, "post", "post_id")
+        response_ids = import_repo.insert_returning_ids(self.db, Response, [
+            {
+                "post_id": post_id,
+                "author_id": record.user_id,
+                "content": record.content,
+                "is_anonymous": record.is_anonymous,
+                **self._timestamps(record, updated=True),
+            }
+            for record, post_id in responses
+        ])
+        self._map("response", [record.id for record, _ in responses], response_ids)
+        touched_posts.update(post_id for _, post_id in responses)
+
+        for kind, model, parent_kind, column in (
+            ("post_like", PostLike, "post", "post_id"),
+            ("response_like", ResponseLike, "response", "response_id"),
+        ):
+            likes = self._resolve(pending[kind], user_ids, parent_kind, column)
+            self.stats.inserted[kind] += import_repo.insert_ignoring_duplicates(self.db, model, [column, "user_id"], [
+                {column: target_id, "user_id": record.user_id, **self._timestamps(record)}
+                for record, target_id in likes
+            ])
+            (touched_posts if kind == "post_like" else touched_responses).update(target_id for _, target_id in likes)
+
+        import_repo.refresh_counters(self.db, touched_posts, touched_responses)
+
+    def _write_forums(self, records, user_ids) -> None:
+        existing = import_repo.get_forum_ids_by_name(self.db, (record.name for _, record in records))
+        new_records = {}
+        reused = []
+        for line_no, record in records:
+            missing = [user_id for user_id in record.moderator_ids if user_id not in user_ids]
+            if not record.moderator_ids or missing:
+                self.stats.skip(line_no, f"unknown moderator ids {missing}" if missing else "at least one moderator is required")
+            elif record.name in existing or record.name in new_records:
+                # Names are unique: the record maps onto the forum already holding it
+                reused.append(record)
+            else:
+                new_records[record.name] = record
+        new_records = list(new_records.values())
+        forum_ids = import_repo.insert_returning_ids(self.db, Forum, [
+            {
+                "name": record.name,
+                "description": record.description,
+                "thematic": record.thematic,
+                **self._timestamps(record),
+            }
+            for record in new_records
+        ])
+        self._map("forum", [record.id for record in new_records], forum_ids)
+        existing.update(zip((record.name for record in new_records), forum_ids))
+        pairs = [(record.id, existing[record.name]) for record in reused]
+        self.id_map["forum"].update(pairs)
+        import_repo.save_id_map(self.db, self.import_id, "forum", pairs)
+        import_repo.insert_rows(self.db, ForumModerator, [
+            {"forum_id": forum_id, "user_id": user_id}
+            for record, forum_id in zip(new_records, forum_ids)
+            for user_id in set(record.moderator_ids)
+        ])
+
+    def _unseen(self, kind: str, records) -> list:
+        """Drop records whose source id was already imported (the id map holds one row per source id)"""
+        seen = self.id_map[kind]
+        unseen = {}
+        for line_no, record in records:
+            if record.id in seen or record.id in unseen:
+                self.stats.skip(line_no, f"duplicate {kind} id {record.id}")
+            else:
+                unseen[record.id] = (line_no, record)
+        return list(unseen.values())
+
+    def _resolve(self, records, user_ids, parent_kind: str, parent_field: str) -> list:
+        """(record, local parent id) of the records whose user and parent are known"""
+        resolved = []
+        parents = self.id_map[parent_kind]
+        for line_no, record in records:
+            parent_id = parents.get(getattr(record, parent_field))
+            if parent_id is None:
+                self.stats.skip(line_no, f"unknown {parent_kind} {getattr(record, parent_field)}")
+            elif record.user_id not in user_ids:
+                self.stats.skip(line_no, f"unknown user {record.user_id}")
+            else:
+                resolved.append((record, parent_id))
+        return resolved
+
+    def _map(self, kind: str, source_ids: List[int], target_ids: List[int]) -> None:
+        pairs = list(zip(source_ids, target_ids))
+        self.id_map[kind].update(pairs)
+        import_repo.save_id_map(self.db, self.import_id, kind, pairs)
+        self.stats.inserted[kind] += len(pairs)
+
+    @staticmethod
+    def _timestamps(record, updated: bool = False) -> dict:
+        created_at = record.created_at or datetime.utcnow()
+        return {"created_at": created_at, "updated_at": created_at} if updated else {"created_at": created_at}
@@ -0,0 +1,53 @@
+# services/forum_tasks.py
+import asyncio
+import time
+from starlette.concurrency import run_in_threadpool
+from core.database import SessionLocal
+from repo import forum_repo
+
+
+HOT_SCORE_DECAY_INTERVAL_SECONDS = 600
+PURGE_INTERVAL_SECONDS = 60
+
+
+def decay_epoch() -> int:
+    """Number of the current re-decay interval: the hot feed's order holds within one"""
+    return int(time.time() // HOT_SCORE_DECAY_INTERVAL_SECONDS)
+
+
+def redecay_hot_scores() -> int:
+    """Re-decay stored hot scores in a dedicated session"""
+    db = SessionLocal()
+    try:
+        return forum_repo.redecay_hot_scores(db)
+    finally:
+        db.close()
+
+
+async def hot_score_decay_loop(interval: float = HOT_SCORE_DECAY_INTERVAL_SECONDS):
+    """Background task: keep hot scores following post age between likes and responses"""
+    while True:
+        try:
+            await run_in_threadpool(redecay_hot_scores)
+        except Exception as e:
+            print(f"Error re-decaying hot scores: {e}")
+        await asyncio.sleep(interval)
+
+
+def purge_deleted_posts() -> int:
+    """Purge soft-deleted posts in a dedicated session"""
+    db = SessionLocal()
+    try:
+        return forum_repo.purge_deleted_posts(db)
+    finally:
+        db.close()
+
+
+async def purge_deleted_posts_loop(interval: float = PURGE_INTERVAL_SECONDS):
+    """Background task: remove the rows of soft-deleted posts (POST_DELETE_MODE=soft)"""
+    while True:
+        try:
+            await run_in_threadpool(purge_deleted_posts)
+        except Exception as e:
+            print(f"Error purging deleted posts: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,160 @@
+# services/inference_scheduler.py
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Set, Tuple
+from starlette.concurrency import run_in_threadpool
+
+
+# =====================================================
+# MICRO-BATCHING
+# =====================================================
+# Model inference costs about the same for one text as for a small batch, so
+# concurrent requests are queued and run together: a worker task takes the
+# first queued item, keeps collecting for at most max_wait_ms or until
+# max_batch_size items, runs the batch function once in a thread and routes
+# each result back to the future of the request that submitted it. While a
+# batch runs, new requests queue up and form the next batch.
+#
+# Batches run on the scheduler's own thread pool, never on Starlette's shared
+# one, so inference load cannot starve the other routers' sync endpoints.
+# Admission is bounded: when max_queue requests are already waiting, submit()
+# raises SchedulerOverloaded with a Retry-After estimate instead of queueing.
+
+class SchedulerOverloaded(Exception):
+    """The admission queue is full; retry after `retry_after` seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class BatchScheduler:
+    """Collects submit() calls into batches for a function mapping a list of items to a list of results"""
+
+    def __init__(self, run_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 32, max_wait_ms: float = 10.0,
+                 workers: int = 1, max_queue: int = 256):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.workers = workers
+        self.max_queue = max_queue
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self._batch_seconds: Optional[float] = None  # Moving average of a batch's run time
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Inference scheduler stopped"))
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def submit(self, item: Any) -> Any:
+        """Result of item, computed in the next batch. Raises SchedulerOverloaded when the queue is full"""
+        if self._task is None:
+            # Not started (e.g. a script or a test client without lifespan): run alone
+            return (await run_in_threadpool(self.run_batch, [item]))[0]
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise SchedulerOverloaded(self.retry_after())
+        return await future
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue should have drained, at least 1"""
+        if self._queue is None or self._batch_seconds is None:
+            return 1
+        batches = math.ceil(self._queue.qsize() / self.max_batch_size)
+        return max(1, math.ceil(batches * self._batch_seconds / self.workers))
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "batches": self.batches,
+            "items": self.items,
+            "rejected": self.rejected,
+            "average_batch_size": round(self.average_batch_size, 2),
+            "average_batch_ms": round(self._batch_seconds * 1000, 1) if self._batch_seconds is not None else None,
+        }
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Callers that went away (cancelled requests) are not worth a slot in the forward pass
+        return [(item, future) for item, future in batch if not future.done()]
+
+    async def _run(self) -> None:
+        while True:
+            # A free worker first: meanwhile requests wait in the bounded queue
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            if not batch:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            started = time.perf_counter()
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.run_batch, [item for item, _ in batch]
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        elapsed = time.perf_counter() - started
+        self._batch_seconds = elapsed if self._batch_seconds is None else 0.8 * self._batch_seconds + 0.2 * elapsed
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,197 @@
+# services/journal_analytics.py
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy.orm import Session
+from core.cache import TTLCache
+from repo import journal_repo
+from typing import Dict, List, Sequence
+
+
+# =====================================================
+# MOOD ANALYTICS
+# =====================================================
+# Everything is computed from two arrays, the creation time (unix seconds) and
+# the humor code of each journal: entries are bucketed with np.bincount into
+# (day x humor), (weekday x humor), (hour x humor) and (week x humor) count
+# matrices, and windows are differences of cumulative sums. Results are cached
+# per user and validated against the user's last write (one index probe), so
+# they are recomputed after any create, edit or delete, on any worker.
+
+SECONDS_PER_DAY = 86400
+ROLLING_WINDOWS = (7, 30)
+# Change points: compare the humor mix of the CHANGE_POINT_WEEKS weeks before
+# and after each week boundary (total variation distance, 0..1)
+CHANGE_POINT_WEEKS = 4
+CHANGE_POINT_MIN_SCORE = 0.4
+CHANGE_POINT_MIN_ENTRIES = 5
+
+_analytics = TTLCache(maxsize=1_000, ttl=3600.0)
+
+
+def _dates(days: np.ndarray) -> List[str]:
+    """ISO dates of day numbers (days since 1970-01-01)"""
+    return np.datetime_as_string(days.astype("datetime64[D]")).tolist()
+
+
+def _shares(counts: np.ndarray) -> np.ndarray:
+    """Rows of counts as fractions of their total (0 for empty rows)"""
+    totals = counts.sum(axis=-1, keepdims=True)
+    return np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+
+def _distribution(labels: Sequence[str], shares: np.ndarray) -> Dict[str, float]:
+    return {label: round(share, 4) for label, share in zip(labels, shares.tolist()) if share}
+
+
+def _empty(utc_offset: int) -> dict:
+    return {
+        "entries": 0,
+        "first_entry": None,
+        "last_entry": None,
+        "utc_offset": utc_offset,
+        "humors": [],
+        "rolling": {f"{window}d": [] for window in ROLLING_WINDOWS},
+        "streaks": {},
+        "weekday_heatmap": {},
+        "hour_heatmap": {},
+        "change_points": [],
+    }
+
+
+def _streaks(daily: np.ndarray, labels: Sequence[str], first_day: int, today: int) -> dict:
+    """Current and longest run of consecutive days with an entry, per humor"""
+    present = (daily > 0).astype(np.int8)
+    # +1 where a run starts, -1 one day after it ends, one row per humor
+    edges = np.diff(np.pad(present, ((1, 1), (0, 0))), axis=0).T
+    humors, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    lengths = ends - starts
+
+    longest = np.zeros(len(labels), dtype=np.int64)
+    np.maximum.at(longest, humors, lengths)
+    # Last day of each humor's longest run (the latest one on ties)
+    order = np.lexsort((ends, lengths, humors))
+    last_of_humor = order[np.r_[np.nonzero(np.diff(humors[order]))[0], len(order) - 1]]
+    longest_end = np.zeros(len(labels), dtype=np.int64)
+    longest_end[humors[last_of_humor]] = first_day + ends[last_of_humor] - 1
+
+    # A streak is current if it reaches today, or yesterday when nothing was written yet today
+    current = np.zeros(len(labels), dtype=np.int64)
+    alive = (ends == today - first_day + 1) | (ends == today - first_day)
+    current[humors[alive]] = lengths[alive]
+
+    end_dates = _dates(longest_end)
+    return {
+        label: {"current": int(current[i]), "longest": int(longest[i]), "longest_end": end_dates[i]}
+        for i, label in enumerate(labels)
+    }
+
+
+def _change_points(day: np.ndarray, codes: np.ndarray, labels: Sequence[str]) -> List[dict]:
+    """Week boundaries where the humor mix before and after differs the most"""
+    k = len(labels)
+    weeks_back = CHANGE_POINT_WEEKS
+    first_monday = int(day.min()) - (int(day.min()) + 3) % 7
+    week = (day - first_monday) // 7
+    n_weeks = int(week.max()) + 1
+    if n_weeks < 2 * weeks_back:
+        return []
+
+    weekly = np.bincount(week * k + codes, minlength=n_weeks * k).reshape(n_weeks, k)
+    cumulative = np.vstack([np.zeros((1, k), dtype=np.int64), weekly.cumsum(axis=0)])
+    boundary = np.arange(weeks_back, n_weeks - weeks_back + 1)
+    before = cumulative[boundary] - cumulative[boundary - weeks_back]
+    after = cumulative[boundary + weeks_back] - cumulative[boundary]
+    before_shares, after_shares = _shares(before), _shares(after)
+    score = 0.5 * np.abs(before_shares - after_shares).sum(axis=1)
+    enough = (before.sum(axis=1) >= CHANGE_POINT_MIN_ENTRIES) & (after.sum(axis=1) >= CHANGE_POINT_MIN_ENTRIES)
+    score = np.where(enough, score, 0.0)
+
+    # Keep the strongest boundary of each neighbourhood of +/- weeks_back
+    neighbourhood = sliding_window_view(np.pad(score, weeks_back, constant_values=-1.0), 2 * weeks_back + 1)
+    peaks = np.nonzero((score >= CHANGE_POINT_MIN_SCORE) & (score == neighbourhood.max(axis=1)))[0]
+    if len(peaks) > 1:
+        peaks = peaks[np.r_[True, np.diff(peaks) > weeks_back]]
+
+    dates = _dates(first_monday + boundary[peaks] * 7)
+    return [
+        {
+            "date": dates[i],
+            "score": round(float(score[peak]), 4),
+            "before": _distribution(labels, before_shares[peak]),
+            "after": _distribution(labels, after_shares[peak]),
+        }
+        for i, peak in enumerate(peaks.tolist())
+    ]
+
+
+def compute_mood_analytics(timestamps: np.ndarray, humors: np.ndarray, today: int, utc_offset: int = 0, days: int = 90) -> dict:
+    """
+    Mood analytics of one timeline: rolling 7/30-day humor distributions for
+    the last `days` days, streaks, weekday and hour-of-day heatmaps and change
+    points. timestamps are unix seconds, today a day number in the user's time
+    zone (utc_offset minutes east of UTC).
+    """
+    if len(timestamps) == 0:
+        return _empty(utc_offset)
+
+    labels, codes = np.unique(humors, return_inverse=True)
+    labels = labels.tolist()
+    k = len(labels)
+    local = timestamps + utc_offset * 60
+    day = local // SECONDS_PER_DAY
+    first_day = int(day.min())
+    span = max(int(day.max()), today) - first_day + 1
+
+    daily = np.bincount((day - first_day) * k + codes, minlength=span * k).reshape(span, k)
+    cumulative = np.vstack([np.zeros((1, k), dtype=np.int64), daily.cumsum(axis=0)])
+    # Windows ending on each of the last `days` days up to today
+    shown_end = min(today - first_day + 1, span)
+    window_end = np.arange(max(shown_end - days, 0), shown_end) + 1
+    window_dates = _dates(first_day + window_end - 1)
+    rolling = {}
+    for window in ROLLING_WINDOWS:
+        counts = cumulative[window_end] - cumulative[np.maximum(window_end - window, 0)]
+        shares = _shares(counts)
+        totals = counts.sum(axis=1).tolist()
+        rolling[f"{window}d"] = [
+            {"date": window_dates[i], "total": totals[i], "distribution": _distribution(labels, shares[i])}
+            for i in range(len(window_end))
+        ]
+
+    weekday = (day + 3) % 7  # 1970-01-01 was a Thursday; Monday = 0
+    weekday_heatmap = np.bincount(weekday * k + codes, minlength=7 * k).reshape(7, k).T.tolist()
+    hour = (local % SECONDS_PER_DAY) // 3600
+    hour_heatmap = np.bincount(hour * k + codes, minlength=24 * k).reshape(24, k).T.tolist()
+
+    first_entry, last_entry = _dates(np.array([day.min(), day.max()]))
+    return {
+        "entries": int(len(timestamps)),
+        "first_entry": first_entry,
+        "last_entry": last_entry,
+        "utc_offset": utc_offset,
+        "humors": labels,
+        "rolling": rolling,
+        "streaks": _streaks(daily, labels, first_day, today),
+        "weekday_heatmap": dict(zip(labels, weekday_heatmap)),  # Monday first
+        "hour_heatmap": dict(zip(labels, hour_heatmap)),
+        "change_points": _change_points(day, codes, labels),
+    }
+
+
+def mood_analytics(db: Session, user_id: int, utc_offset: int = 0, days: int = 90) -> dict:
+    """Mood analytics of a user's journals, cached until their next journal write"""
+    today = (int(time.time()) + utc_offset * 60) // SECONDS_PER_DAY
+    key = (user_id, utc_offset, days, today)
+    last_write = journal_repo.get_last_write(db, user_id)
+    cached = _analytics.get(key)
+    if cached is not None and cached[0] == last_write:
+        return cached[1]
+
+    rows = journal_repo.get_mood_timeline(db, user_id)
+    timestamps = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    humors = np.array([row[1] for row in rows], dtype=str)
+    result = compute_mood_analytics(timestamps, humors, today, utc_offset, days)
+    _analytics.set(key, (last_write, result))
+    return result
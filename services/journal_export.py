@@ -0,0 +1,81 @@
+# services/journal_export.py
+import csv
+import io
+import json
+from core.database import SessionLocal
+from repo import journal_repo
+from sqlalchemy.orm import Session
+from typing import Callable, Iterator
+
+
+# =====================================================
+# STREAMING EXPORT
+# =====================================================
+# Generators for StreamingResponse: rows are read in keyset pages and encoded
+# and flushed in small batches, so memory stays flat however long the journal
+# is. The read transaction ends after each page, before anything is sent: an
+# open SQLite read cursor holds a SHARED lock, and a slow download would lock
+# every writer out. Each uses its own session because it outlives the request
+# handler.
+
+EXPORT_FIELDS = [column.key for column in journal_repo.EXPORT_COLUMNS]
+PAGE_SIZE = 500
+
+
+def _paged(db: Session, fetch_page: Callable, user_id: int, page_size: int = PAGE_SIZE) -> Iterator:
+    """Rows of all pages of fetch_page(db, user_id, after, limit), with no transaction open between pages"""
+    after = None
+    while True:
+        rows, after = fetch_page(db, user_id, after, page_size)
+        db.rollback()  # Read-only: releases the SHARED lock
+        yield from rows
+        if after is None:
+            return
+
+
+def _journal_dict(journal: dict) -> dict:
+    journal["created_at"] = journal["created_at"].isoformat() if journal["created_at"] else None
+    journal["updated_at"] = journal["updated_at"].isoformat() if journal["updated_at"] else None
+    return journal
+
+
+def stream_ndjson(user_id: int, include_rollups: bool = False, flush_every: int = 200) -> Iterator[str]:
+    """
+    One {"type": "journal", ...} line per journal, then, if asked, one
+    {"type": "humor_daily", "date", "humor", "count"} line per rollup cell
+    """
+    db = SessionLocal()
+    try:
+        buffer = []
+        for row in _paged(db, journal_repo.get_export_page, user_id):
+            buffer.append(json.dumps({"type": "journal", **_journal_dict(row)}, ensure_ascii=False) + "\n")
+            if len(buffer) >= flush_every:
+                yield "".join(buffer)
+                buffer.clear()
+        if include_rollups:
+            for day, humor, count in _paged(db, journal_repo.get_humor_rollup_page, user_id):
+                buffer.append(json.dumps({"type": "humor_daily", "date": day.isoformat(), "humor": humor, "count": count}) + "\n")
+                if len(buffer) >= flush_every:
+                    yield "".join(buffer)
+                    buffer.clear()
+        yield "".join(buffer)
+    finally:
+        db.close()
+
+
+def stream_csv(user_id: int, flush_every: int = 200) -> Iterator[str]:
+    """A header row, then one row per journal"""
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for index, row in enumerate(_paged(db, journal_repo.get_export_page, user_id), 1):
+            writer.writerow(_journal_dict(row))
+            if index % flush_every == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    finally:
+        db.close()
@@ -1,9 +1,18 @@
 # services/journal_service.py
 from sqlalchemy.orm import Session
 from models.journal import Journal
-from schemas.journal import JournalCreate, JournalUpdate
+from schemas.journal import JournalCreate, JournalUpdate, JournalSyncChange
 from repo import journal_repo
-from sqlalchemy import func
+from core.pagination import encode_sync_token
+from typing import List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+
+
+# Sync tokens never point past now - overlap: a write that took its updated_at
+# just before a sync but committed just after it is re-sent on the next sync
+# instead of being skipped. Clients apply changes idempotently (upsert by id).
+SYNC_OVERLAP_SECONDS = 5
+SYNC_FIELDS = {"humor", "title", "content", "is_pinned", "color", "report"}
 
 
 def add_note(db: Session, user_id: int, data: JournalCreate):
@@ -19,19 +28,17 @@ def add_note(db: Session, user_id: int, data: JournalCreate):
     return journal_repo.create(db, journal)
 
 
-def get_user_notes(db: Session, user_id: int):
-    """Get all notes for a user (ordered by pinned first)"""
-    return journal_repo.get_by_user(db, user_id)
+def get_user_notes(db: Session, user_id: int, after=None, limit: int = 50, **filters):
+    """
+    Get a page of notes for a user (ordered by pinned first), optionally filtered
+    by humor, color, date_from and date_to. Returns (notes, next_cursor)
+    """
+    return journal_repo.get_by_user(db, user_id, after, limit, **filters)
 
 
-def get_pinned_notes(db: Session, user_id: int):
-    """Get only pinned notes for a user"""
-    return (
-        db.query(Journal)
-        .filter(Journal.user_id == user_id, Journal.is_pinned == True)
-        .order_by(Journal.created_at.desc())
-        .all()
-    )
+def get_pinned_notes(db: Session, user_id: int, after=None, limit: int = 50):
+    """Get a page of pinned notes for a user. Returns (notes, next_cursor)"""
+    return journal_repo.get_by_user(db, user_id, after, limit, pinned=True)
 
 
 def delete_note(db: Session, journal_id: int):
@@ -50,13 +57,22 @@ def update_note(db: Session, journal_id: int, data: JournalUpdate):
     if not journal:
         return None
 
-    for field, value in data.dict(exclude_unset=True).items():
-        setattr(journal, field, value)
-
+    _apply_fields(db, journal, data.dict(exclude_unset=True))
     journal_repo.update(db)
     return journal
 
 
+def _apply_fields(db: Session, journal: Journal, fields: dict) -> None:
+    """Set fields on a journal, moving it to its new humor in the daily rollup"""
+    old_humor = journal.humor
+    for field, value in fields.items():
+        setattr(journal, field, value)
+
+    if journal.humor != old_humor:
+        journal_repo.bump_humor_rollup(db, journal.id, -1, old_humor)
+        journal_repo.bump_humor_rollup(db, journal.id, 1, journal.humor)
+
+
 def toggle_pin(db: Session, journal_id: int):
     """Toggle pin status of a note"""
     journal = journal_repo.get_one(db, journal_id)
@@ -81,22 +97,15 @@ def update_color(db: Session, journal_id: int, color: str):
 # services/journal_service.py
 def get_note_by_id(db: Session, journal_id: int):
     """Get a single journal entry by ID"""
-    return db.query(Journal).filter(Journal.id == journal_id).first()
-
-
-def humor_report(db: Session, user_id: int):
-    """Generate humor statistics grouped by date"""
-    rows = (
-        db.query(
-            Journal.humor,
-            func.date(Journal.created_at),
-            func.count(Journal.id)
-        )
-        .filter(Journal.user_id == user_id)
-        .group_by(Journal.humor, func.date(Journal.created_at))
-        .order_by(func.date(Journal.created_at))
-        .all()
-    )
+    return journal_repo.get_one(db, journal_id)
+
+
+def humor_report(db: Session, user_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None, granularity: str = "day"):
+    """
+    Generate humor statistics grouped by day, week or month (the date is the
+    first day of the period), read from the daily humor rollup
+    """
+    rows = journal_repo.get_humor_rollup(db, user_id, date_from, date_to, granularity)
 
     report = {}
     for humor, date, count in rows:
@@ -106,3 +115,99 @@ def humor_report(db: Session, user_id: int):
         })
 
     return report
+
+
+# =====================================================
+# DELTA SYNC
+# =====================================================
+
+def _tombstone_out(journal: Journal) -> dict:
+    return {"id": journal.id, "deleted_at": journal.deleted_at}
+
+
+def _next_sync_position(since, last, has_more: bool) -> Tuple[str, int]:
+    """Where the next sync starts: after the last row sent, held back by the overlap"""
+    if has_more:
+        return last
+    horizon = (journal_repo.storage_timestamp(datetime.utcnow() - timedelta(seconds=SYNC_OVERLAP_SECONDS)), 0)
+    position = last or since
+    if position is None or position > horizon:
+        position = max(since, horizon) if since is not None else horizon
+    return position
+
+
+def get_changes(db: Session, user_id: int, since: Optional[Tuple[str, int]] = None, limit: int = 500) -> dict:
+    """
+    A page of a user's changes after a sync token: edited or created journals and
+    tombstones of deleted ones. No token, or one older than the tombstone
+    retention (reset), starts a full sync of the live journals.
+    """
+    reset = False
+    if since is not None:
+        retention = datetime.utcnow() - timedelta(days=journal_repo.TOMBSTONE_RETENTION_DAYS)
+        if since[0] < journal_repo.storage_timestamp(retention):
+            since, reset = None, True
+
+    rows, has_more = journal_repo.get_changes(db, user_id, since, limit)
+    last = (rows[-1][1], rows[-1][0].id) if rows else None
+    return {
+        "changes": [journal for journal, _ in rows if journal.deleted_at is None],
+        "deleted": [_tombstone_out(journal) for journal, _ in rows if journal.deleted_at is not None],
+        "next_token": encode_sync_token(*_next_sync_position(since, last, has_more)),
+        "has_more": has_more,
+        "reset": reset,
+    }
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive UTC, as timestamps are stored"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def apply_changes(db: Session, user_id: int, changes: List[JournalSyncChange]) -> dict:
+    """
+    Apply a batch of client changes in one transaction. A change to an existing
+    journal wins only if it was made after the server's last write of that
+    journal (last writer wins); otherwise the server version is returned as a
+    conflict. Changes to deleted journals are answered with their tombstone.
+    """
+    existing = journal_repo.get_for_sync(db, user_id, [change.id for change in changes if change.id is not None])
+    result = {"created": [], "applied": [], "conflicts": [], "deleted": [], "rejected": []}
+    created = []
+
+    try:
+        for change in changes:
+            fields = change.model_dump(exclude_unset=True, include=SYNC_FIELDS)
+            if change.id is None:
+                if change.deleted:
+                    continue  # Created and deleted offline
+                journal = Journal(user_id=user_id, **fields)
+                if change.created_at is not None:
+                    journal.created_at = _utc(change.created_at)
+                journal_repo.add(db, journal)
+                created.append((change.client_id, journal))
+                continue
+
+            journal = existing.get(change.id)
+            if journal is None:
+                result["rejected"].append(change.id)
+            elif journal.deleted_at is not None:
+                result["deleted"].append(_tombstone_out(journal))
+            elif _utc(change.updated_at) <= journal.updated_at:
+                result["conflicts"].append(journal)
+            else:
+                if change.deleted:
+                    journal_repo.tombstone(db, journal)
+                else:
+                    _apply_fields(db, journal, fields)
+                if journal.id not in result["applied"]:
+                    result["applied"].append(journal.id)
+        journal_repo.update(db)
+    except Exception:
+        db.rollback()
+        raise
+
+    result["created"] = [{"client_id": client_id, "id": journal.id} for client_id, journal in created]
+    return result
@@ -0,0 +1,27 @@
+# services/journal_tasks.py
+import asyncio
+from starlette.concurrency import run_in_threadpool
+from core.database import SessionLocal
+from repo import journal_repo
+
+
+TOMBSTONE_PURGE_INTERVAL_SECONDS = 24 * 3600
+
+
+def purge_tombstones() -> int:
+    """Purge expired journal tombstones in a dedicated session"""
+    db = SessionLocal()
+    try:
+        return journal_repo.purge_tombstones(db)
+    finally:
+        db.close()
+
+
+async def purge_tombstones_loop(interval: float = TOMBSTONE_PURGE_INTERVAL_SECONDS):
+    """Background task: drop tombstones older than the sync retention"""
+    while True:
+        try:
+            await run_in_threadpool(purge_tombstones)
+        except Exception as e:
+            print(f"Error purging journal tombstones: {e}")
+        await asyncio.sleep(interval)
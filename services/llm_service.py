@@ -1,64 +1,158 @@
-from transformers import pipeline
-import torch
+import os
+import threading
+import time
+from typing import List
+from services.inference_scheduler import BatchScheduler
+from services.emotion_cache import emotion_cache
+from services.emotion_backends import EMOTION_BACKEND, EmotionBackend, create_backend
 
-# Load emotion classification model once at startup
+# EMOTION_ENABLED=0 on API processes that do not serve inference: the emotion
+# router is not mounted and no inference runtime is ever imported
+EMOTION_ENABLED = os.getenv("EMOTION_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Load emotion classification model once at startup (see start_warmup)
 _emotion_classifier = None
+_load_lock = threading.Lock()
+_model_lock = threading.Lock()
+_model_status = {
+    "state": "not_loaded" if EMOTION_ENABLED else "disabled",
+    "backend": EMOTION_BACKEND,
+    "error": None,
+    "load_seconds": None,
+}
+
+WARMUP_TEXTS = [
+    "I feel calm today.",
+    "Work has been exhausting and I can't stop worrying about tomorrow's meeting.",
+]
+
+# Map model labels to your required emotions
+# Model outputs: anger, disgust, fear, joy, neutral, sadness, surprise
+label_mapping = {
+    'anger': 'anger',
+    'fear': 'fear',
+    'sadness': 'sadness',
+    'joy': 'loneliness',  # Map as needed
+    'disgust': 'burnout',  # Map as needed
+    'surprise': 'anxiety',  # Map as needed
+    'neutral': 'anxiety'
+}
+
+REQUIRED_EMOTIONS = ['anxiety', 'burnout', 'sadness', 'anger', 'fear', 'loneliness']
+FALLBACK_EMOTIONS = {"anxiety": 1.0}
 
-def get_emotion_classifier():
+def get_emotion_classifier() -> EmotionBackend:
+    """The loaded inference backend picked by EMOTION_BACKEND"""
     global _emotion_classifier
     if _emotion_classifier is None:
-        # This model is specifically trained for emotion detection
-        _emotion_classifier = pipeline(
-            "text-classification",
-            model="j-hartmann/emotion-english-distilroberta-base",
-            top_k=None,  # Return all emotions with probabilities
-            device=0 if torch.cuda.is_available() else -1  # Use GPU if available
-        )
+        with _load_lock:
+            if _emotion_classifier is None:
+                backend = create_backend(EMOTION_BACKEND)
+                backend.load()
+                _emotion_classifier = backend
     return _emotion_classifier
 
 
+def model_status() -> dict:
+    """disabled, not_loaded, loading, ready or failed, with the load error and time"""
+    return dict(_model_status)
+
+
+def warm_up() -> None:
+    """Import the ML stack, load the model and run a dummy batch through it"""
+    _model_status.update(state="loading", error=None)
+    started = time.perf_counter()
+    try:
+        classify_emotions(WARMUP_TEXTS)
+    except Exception as e:
+        print(f"Error loading the emotion model: {e}")
+        _model_status.update(state="failed", error=str(e))
+        return
+    _model_status.update(state="ready", load_seconds=round(time.perf_counter() - started, 2))
+    print(f"✅ Emotion model ready ({EMOTION_BACKEND}) in {_model_status['load_seconds']}s")
+
+
+def start_warmup() -> threading.Thread:
+    """Warm the model up on a background thread, so startup does not wait for it"""
+    _model_status.update(state="loading")
+    thread = threading.Thread(target=warm_up, name="emotion-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _map_emotions(results: List[dict]) -> dict[str, float]:
+    """Convert the model's label scores to our emotions, normalized to sum to 1"""
+    emotions = {}
+    for item in results:
+        label = item['label'].lower()
+        score = item['score']
+
+        mapped_label = label_mapping.get(label, label)
+
+        # If your required emotions only
+        if mapped_label in REQUIRED_EMOTIONS:
+            emotions[mapped_label] = emotions.get(mapped_label, 0.0) + score
+
+    # Normalize to sum to 1
+    total = sum(emotions.values())
+    if total > 0:
+        return {k: v/total for k, v in emotions.items()}
+    return dict(FALLBACK_EMOTIONS)
+
+
+def classify_emotions(texts: List[str]) -> List[dict[str, float]]:
+    """
+    Run the model on several texts in a single forward pass, bypassing the cache.
+    Returns one emotion -> probability dictionary per text, in order.
+    """
+    classifier = get_emotion_classifier()
+    # One list per text; long texts are cut at the model's 512 tokens.
+    # Backends (their fast tokenizers in particular) are not thread-safe
+    with _model_lock:
+        results = classifier.predict(texts)
+    return [_map_emotions(scores) for scores in results]
+
+
+def analyze_emotions_batch(texts: List[str]) -> List[dict[str, float]]:
+    """
+    Analyze emotions of several texts. Cached results are looked up in bulk;
+    only the distinct texts missing from the cache reach the model, in one batch.
+    Returns one emotion -> probability dictionary per text, in order.
+    """
+    keys = [emotion_cache.key(text) for text in texts]
+    found = emotion_cache.get_many(keys)
+    missing = {key: text for key, text in zip(keys, texts) if key not in found}
+    if missing:
+        try:
+            computed = dict(zip(missing, classify_emotions(list(missing.values()))))
+        except Exception as e:
+            # Fallbacks are answered but never cached
+            print(f"Error analyzing emotions: {e}")
+            computed = {key: dict(FALLBACK_EMOTIONS) for key in missing}
+        else:
+            emotion_cache.set_many(computed)
+        found.update(computed)
+    return [found[key] for key in keys]
+
+
 def analyze_emotions(text: str) -> dict[str, float]:
     """
     Analyze emotions using a pre-trained BERT model.
     Returns a dictionary mapping emotions to probabilities.
     """
-    try:
-        classifier = get_emotion_classifier()
-        results = classifier(text)[0]  # Get first result
-        
-        # Convert to your format
-        emotions = {}
-        for item in results:
-            label = item['label'].lower()
-            score = item['score']
-            
-            # Map model labels to your required emotions
-            # Model outputs: anger, disgust, fear, joy, neutral, sadness, surprise
-            label_mapping = {
-                'anger': 'anger',
-                'fear': 'fear',
-                'sadness': 'sadness',
-                'joy': 'loneliness',  # Map as needed
-                'disgust': 'burnout',  # Map as needed
-                'surprise': 'anxiety',  # Map as needed
-                'neutral': 'anxiety'
-            }
-            
-            mapped_label = label_mapping.get(label, label)
-            
-            # If your required emotions only
-            if mapped_label in ['anxiety', 'burnout', 'sadness', 'anger', 'fear', 'loneliness']:
-                emotions[mapped_label] = emotions.get(mapped_label, 0.0) + score
-        
-        # Normalize to sum to 1
-        total = sum(emotions.values())
-        if total > 0:
-            emotions = {k: v/total for k, v in emotions.items()}
-        else:
-            emotions = {"anxiety": 1.0}
-            
-        return emotions
-        
-    except Exception as e:
-        print(f"Error analyzing emotions: {e}")
-        return {"anxiety": 1.0}
\ No newline at end of file
+    return analyze_emotions_batch([text])[0]
+
+
+# Concurrent /emotion/analyze requests share forward passes of up to
+# EMOTION_BATCH_SIZE texts, waiting at most EMOTION_BATCH_WAIT_MS for company.
+# Batches run on EMOTION_WORKERS dedicated threads; beyond EMOTION_QUEUE_SIZE
+# waiting requests the API answers 429. Both backends already spread one forward pass
+# over the cores and the model runs one batch at a time (_model_lock), so extra
+# workers mainly overlap cache lookups and writes with inference.
+emotion_scheduler = BatchScheduler(
+    analyze_emotions_batch,
+    max_batch_size=int(os.getenv("EMOTION_BATCH_SIZE", "32")),
+    max_wait_ms=float(os.getenv("EMOTION_BATCH_WAIT_MS", "10")),
+    workers=int(os.getenv("EMOTION_WORKERS", "2")),
+    max_queue=int(os.getenv("EMOTION_QUEUE_SIZE", "256"))
+)